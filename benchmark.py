@@ -0,0 +1,411 @@
+# Description: Benchmark suite for the hash map implementations.
+# Runs the Separate Chaining and Open Addressing HashMaps (with hash_function_1
+# and hash_function_2) and the built-in dict through insert-heavy, read-heavy,
+# delete-churn, miss-heavy and adversarial-collision workloads at several sizes
+# and load factors. Reports throughput, per-operation latency percentiles and the
+# peak memory traced while the workload runs, as a table and as JSON that a
+# later run can be compared against with --baseline.
+# --probes instead measures the probe lengths of every open addressing probe
+# strategy at load factors up to and past the 0.5 resize threshold.
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from itertools import islice, permutations
+
+from a6_include import hash_function_1, hash_function_2
+import hash_map_cuckoo
+import hash_map_oa
+import hash_map_sc
+
+WORKLOADS = ('insert', 'read', 'delete_churn', 'miss', 'adversarial')
+
+# Load factors measured by --probes unless --load-factors is given
+PROBE_LOAD_FACTORS = (0.25, 0.5, 0.7, 0.8, 0.9)
+
+# Every permutation of this string has the same hash_function_1 code
+_ADVERSARIAL_LETTERS = 'abcdefghij'
+
+
+class _DictMap:
+    """
+    The built-in dict behind the put/get/remove methods the workloads call.
+    """
+    def __init__(self) -> None:
+        self._data = {}
+
+    def put(self, key: str, value: object) -> None:
+        self._data[key] = value
+
+    def get(self, key: str) -> object:
+        return self._data.get(key)
+
+    def remove(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def get_size(self) -> int:
+        return len(self._data)
+
+
+def _make_sc(function):
+    return lambda capacity: hash_map_sc.HashMap(capacity, function)
+
+
+def _make_oa(function):
+    return lambda capacity: hash_map_oa.HashMap(capacity, function)
+
+
+# name -> factory taking an initial capacity, or None for dict
+IMPLEMENTATIONS = {
+    'sc_h1': _make_sc(hash_function_1),
+    'sc_h2': _make_sc(hash_function_2),
+    'oa_h1': _make_oa(hash_function_1),
+    'oa_h2': _make_oa(hash_function_2),
+    'cuckoo': hash_map_cuckoo.HashMap,
+    'dict': None,
+}
+
+
+def random_keys(count: int, rng: random.Random, prefix: str = 'k') -> list:
+    """
+    Return count distinct random lowercase keys.
+    """
+    keys = set()
+    while len(keys) < count:
+        keys.add(prefix + ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(8)))
+
+    keys = sorted(keys)
+    rng.shuffle(keys)
+    return keys
+
+
+def adversarial_keys(count: int) -> list:
+    """
+    Return up to count permutations of one string, which all collide under hash_function_1.
+    """
+    return [''.join(letters) for letters in islice(permutations(_ADVERSARIAL_LETTERS), count)]
+
+
+def workload_keys(workload: str, size: int, rng: random.Random) -> tuple[list, list]:
+    """
+    Return the keys a workload stores and the keys it probes or adds later.
+    """
+    if workload == 'insert':
+        return random_keys(size, rng), []
+
+    if workload == 'adversarial':
+        return adversarial_keys(size), []
+
+    keys = random_keys(size, rng)
+
+    if workload == 'read':
+        return keys, [keys[rng.randrange(size)] for _ in range(size)]
+
+    if workload == 'miss':
+        return keys, random_keys(size, rng, prefix='m')
+
+    if workload == 'delete_churn':
+        return keys, random_keys(size, rng, prefix='n')
+
+    raise ValueError("unknown workload " + repr(workload))
+
+
+def build_calls(workload: str, hash_map, keys: list, others: list) -> list:
+    """
+    Fill hash_map as the workload needs and return its timed calls
+    as a list of (bound method, arguments).
+    """
+    if workload == 'insert':
+        return [(hash_map.put, (key, i)) for i, key in enumerate(keys)]
+
+    if workload == 'adversarial':
+        calls = [(hash_map.put, (key, i)) for i, key in enumerate(keys)]
+        return calls + [(hash_map.get, (key,)) for key in keys]
+
+    # The remaining workloads start from a table holding every key
+    for i, key in enumerate(keys):
+        hash_map.put(key, i)
+
+    if workload in ('read', 'miss'):
+        return [(hash_map.get, (key,)) for key in others]
+
+    # delete_churn: remove a live key and insert a fresh one, so the size
+    # stays constant while tombstones and emptied chains pile up
+    calls = []
+    for i in range(len(keys)):
+        calls.append((hash_map.remove, (keys[i],)))
+        calls.append((hash_map.put, (others[i], i)))
+    return calls
+
+
+def run_calls(calls: list) -> tuple[int, list]:
+    """
+    Make every call, timing each one. Returns the total and the per-call nanoseconds.
+    """
+    clock = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+
+    start = clock()
+    for method, args in calls:
+        before = clock()
+        method(*args)
+        append(clock() - before)
+
+    return clock() - start, latencies
+
+
+def percentile(ordered: list, fraction: float) -> int:
+    """
+    Nearest-rank percentile of an ascending list.
+    """
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(name: str, workload: str, size: int, load_factor: float,
+            repeat: int, seed: int, trace_memory: bool) -> dict:
+    """
+    Run one workload on one implementation and return its result record.
+    The table starts at capacity size / load_factor, dict takes no capacity.
+    peak_bytes is the most memory traced above the prepared keys while the table
+    is filled and the workload runs, including the call list every implementation shares.
+    """
+    factory = IMPLEMENTATIONS[name]
+
+    def new_map():
+        if factory is None:
+            return _DictMap()
+        return factory(max(1, int(size / load_factor)))
+
+    totals = []
+    latencies = []
+    hash_map = None
+    for run in range(repeat):
+        hash_map = new_map()
+        keys, others = workload_keys(workload, size, random.Random(seed + run))
+        calls = build_calls(workload, hash_map, keys, others)
+        total, run_latencies = run_calls(calls)
+        totals.append(total)
+        latencies.extend(run_latencies)
+
+    # A separate run under tracemalloc, tracing slows every allocation down
+    peak_bytes = None
+    if trace_memory:
+        keys, others = workload_keys(workload, size, random.Random(seed))
+        tracemalloc.start()
+        run_calls(build_calls(workload, new_map(), keys, others))
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    ops = len(latencies) // repeat
+    seconds = statistics.median(totals) / 1e9
+    latencies.sort()
+
+    return {
+        'implementation': name,
+        'workload': workload,
+        'size': size,
+        'load_factor': None if factory is None else load_factor,
+        'ops': ops,
+        'seconds': seconds,
+        'ops_per_sec': ops / seconds if seconds else None,
+        'p50_ns': percentile(latencies, 0.50),
+        'p90_ns': percentile(latencies, 0.90),
+        'p99_ns': percentile(latencies, 0.99),
+        'max_ns': latencies[-1],
+        'peak_bytes': peak_bytes,
+        'final_size': hash_map.get_size(),
+        'final_load': None if factory is None else hash_map.table_load(),
+    }
+
+
+def run_suite(implementations, workloads, sizes, load_factors, repeat: int = 3,
+              seed: int = 0, trace_memory: bool = True, adversarial_size: int = 1000) -> list:
+    """
+    Run every combination and return the list of result records.
+    dict runs once per size since it takes no load factor.
+    """
+    results = []
+    for workload in workloads:
+        for size in sizes:
+            if workload == 'adversarial':
+                size = min(size, adversarial_size)
+            for name in implementations:
+                factors = load_factors[:1] if IMPLEMENTATIONS[name] is None else load_factors
+                for load_factor in factors:
+                    record = measure(name, workload, size, load_factor, repeat, seed, trace_memory)
+                    results.append(record)
+                    print(format_record(record), file=sys.stderr, flush=True)
+
+    return results
+
+
+def probe_lengths(probe: str, function, size: int, load_factor: float, seed: int = 0) -> dict:
+    """
+    Fill an open addressing table to load_factor with one probe strategy and
+    return the mean and max slots visited by successful and unsuccessful lookups.
+    The fill skips the resize check, so loads above 0.5 can be measured.
+    """
+    capacity_mode = 'power_of_two' if probe == 'triangular' else 'prime'
+    hash_map = hash_map_oa.HashMap(max(1, int(size / load_factor)), function, capacity_mode, probe=probe)
+    capacity = hash_map.get_capacity()
+    rng = random.Random(seed)
+    keys = random_keys(int(capacity * load_factor), rng)
+
+    record = {'probe': probe, 'function': function.__name__, 'capacity': capacity,
+              'load_factor': load_factor, 'size': 0, 'full': False}
+    try:
+        for i, key in enumerate(keys):
+            hash_map._insert(key, i, function(key))
+    except Exception:
+        # Quadratic probing can miss every free slot past half load
+        record['full'] = True
+    record['size'] = hash_map.get_size()
+
+    for name, lookups in (('hit', keys[:hash_map.get_size()]), ('miss', random_keys(len(keys), rng, 'm'))):
+        probes = []
+        for key in lookups:
+            hash_map._find_entry(key, function(key))
+            probes.append(hash_map._last_probes)
+        record[name + '_mean'] = statistics.fmean(probes) if probes else None
+        record[name + '_max'] = max(probes, default=None)
+
+    return record
+
+
+def run_probe_suite(functions, size: int, load_factors, seed: int = 0) -> list:
+    """
+    Measure probe_lengths for every strategy, hash function and load factor.
+    """
+    results = []
+    for function in functions:
+        for load_factor in load_factors:
+            for probe in hash_map_oa.PROBE_STRATEGIES:
+                record = probe_lengths(probe, function, size, load_factor, seed)
+                results.append(record)
+                print(format_probe_record(record), file=sys.stderr, flush=True)
+
+    return results
+
+
+def format_probe_record(record: dict) -> str:
+    """
+    One line of the probe length table.
+    """
+    def number(value, spec):
+        return '-' if value is None else format(value, spec)
+
+    return '{:<16} {:<11} {:>5.2f} {:>8} {:>9} {:>8} {:>9} {:>8}{}'.format(
+        record['function'], record['probe'], record['load_factor'], record['capacity'],
+        number(record['hit_mean'], '.2f'), number(record['hit_max'], 'd'),
+        number(record['miss_mean'], '.2f'), number(record['miss_max'], 'd'),
+        '  full at ' + str(record['size']) if record['full'] else '')
+
+
+def format_record(record: dict) -> str:
+    """
+    One line of the human-readable table.
+    """
+    load_factor = '-' if record['load_factor'] is None else format(record['load_factor'], '.2f')
+    peak = '-' if record['peak_bytes'] is None else format(record['peak_bytes'] // 1024, 'd') + 'K'
+    return '{:<13} {:<6} {:>7} {:>5} {:>12,.0f} {:>9} {:>9} {:>9} {:>9}'.format(
+        record['workload'], record['implementation'], record['size'], load_factor,
+        record['ops_per_sec'] or 0, record['p50_ns'], record['p90_ns'], record['p99_ns'], peak)
+
+
+def compare(results: list, baseline: list, threshold: float) -> list:
+    """
+    Return (key, old ops/sec, new ops/sec) for every result whose throughput
+    fell more than threshold below the matching baseline record.
+    """
+    def key(record):
+        return (record['implementation'], record['workload'], record['size'], record['load_factor'])
+
+    previous = {key(record): record for record in baseline}
+    regressions = []
+    for record in results:
+        old = previous.get(key(record))
+        if old and old['ops_per_sec'] and record['ops_per_sec'] < old['ops_per_sec'] * (1 - threshold):
+            regressions.append((key(record), old['ops_per_sec'], record['ops_per_sec']))
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--impl', nargs='+', choices=list(IMPLEMENTATIONS), default=list(IMPLEMENTATIONS))
+    parser.add_argument('--workload', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000])
+    parser.add_argument('--load-factors', nargs='+', type=float,
+                        help='default 0.25 0.5, or 0.25 to 0.9 with --probes')
+    parser.add_argument('--adversarial-size', type=int, default=1000,
+                        help='cap on the number of colliding keys, those workloads are quadratic')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    parser.add_argument('--json', metavar='PATH', help='write the results as JSON, - for stdout')
+    parser.add_argument('--baseline', metavar='PATH', help='JSON of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='throughput drop that counts as a regression (default 0.10)')
+    parser.add_argument('--probes', action='store_true',
+                        help='measure open addressing probe lengths per probe strategy instead')
+    args = parser.parse_args(argv)
+
+    if args.probes:
+        print('{:<16} {:<11} {:>5} {:>8} {:>9} {:>8} {:>9} {:>8}'.format(
+            'function', 'probe', 'load', 'capacity', 'hit mean', 'hit max', 'miss mean', 'miss max'),
+            file=sys.stderr)
+        results = run_probe_suite((hash_function_1, hash_function_2), args.sizes[-1],
+                                  args.load_factors or PROBE_LOAD_FACTORS, args.seed)
+        if args.json:
+            report = {'python': platform.python_version(), 'seed': args.seed, 'probes': results}
+            if args.json == '-':
+                json.dump(report, sys.stdout, indent=2)
+                print()
+            else:
+                with open(args.json, 'w') as file:
+                    json.dump(report, file, indent=2)
+        return 0
+
+    print('{:<13} {:<6} {:>7} {:>5} {:>12} {:>9} {:>9} {:>9} {:>9}'.format(
+        'workload', 'impl', 'size', 'load', 'ops/sec', 'p50 ns', 'p90 ns', 'p99 ns', 'peak'),
+        file=sys.stderr)
+
+    results = run_suite(args.impl, args.workload, args.sizes, args.load_factors or [0.25, 0.5], args.repeat,
+                        args.seed, not args.no_memory, args.adversarial_size)
+
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)['results'], args.threshold)
+        for key, old, new in regressions:
+            print('regression:', key, format(old, ',.0f'), '->', format(new, ',.0f'), 'ops/sec',
+                  file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
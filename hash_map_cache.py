@@ -0,0 +1,350 @@
+# Description: Bounded LRU cache with optional per-entry expiry, built on the
+# Separate Chaining HashMap. Each key maps to an entry that is also a node of an
+# intrusive doubly linked recency list, so a get or put costs one hash probe and
+# the least recently used entry is found and evicted in O(1). The cache is bounded
+# by a number of entries, an approximate number of bytes, or both.
+
+import sys
+import time
+
+from a6_include import hash_function_1
+from hash_map_sc import HashMap
+
+# Default of pop(), tells "no default given" apart from a default of None
+_MISSING = object()
+
+# Approximate bytes of bookkeeping per entry besides its key and value:
+# the entry itself, its chain node and its share of the bucket array
+_ENTRY_BYTES = 160
+
+
+class _CacheEntry:
+    """
+    A cached value and its links in the recency list, newest toward the head.
+    """
+    __slots__ = ('key', 'value', 'newer', 'older', 'expires', 'size')
+
+    def __init__(self, key: str, value: object) -> None:
+        self.key = key
+        self.value = value
+        self.newer = None
+        self.older = None
+        self.expires = None
+        self.size = 0
+
+
+def approximate_size(key: str, value: object) -> int:
+    """
+    Return the shallow bytes of key and value plus the per-entry bookkeeping.
+    Objects the value refers to are not counted.
+    """
+    return sys.getsizeof(key) + sys.getsizeof(value) + _ENTRY_BYTES
+
+
+class LRUCache:
+    def __init__(self, max_entries: int = None, max_bytes: int = None, ttl: float = None,
+                 function=hash_function_1, sizeof=approximate_size, clock=time.monotonic) -> None:
+        """
+        Initialize an empty cache holding at most max_entries entries and at most
+        about max_bytes bytes, as measured by sizeof(key, value). ttl is the default
+        lifetime in seconds of an entry, None keeps entries until they are evicted.
+        clock returns the current time in seconds.
+        """
+        if max_entries is None and max_bytes is None:
+            raise ValueError("a cache needs max_entries, max_bytes or both")
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._bytes = 0
+
+        # key -> _CacheEntry, sized so that a full cache plus the entry
+        # about to push out the oldest one never resizes
+        self._entries = HashMap(max_entries + 1 if max_entries else 11, function)
+
+        # Sentinel of the circular recency list: head.older is the most
+        # recently used entry and head.newer the least recently used one
+        self._head = _CacheEntry(None, None)
+        self._head.newer = self._head
+        self._head.older = self._head
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get_size(self) -> int:
+        """
+        Return number of cached entries, expired ones not yet dropped included
+        """
+        return self._entries.get_size()
+
+    def get_bytes(self) -> int:
+        """
+        Return the approximate bytes of the cached entries
+        """
+        return self._bytes
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        Return the value of key and mark it most recently used,
+        or default for a missing or expired key.
+        """
+        entry = self._entries.get(key)
+
+        if entry is not None and self._expired(entry):
+            self._drop(entry)
+            self._expirations += 1
+            entry = None
+
+        if entry is None:
+            self._misses += 1
+            return default
+
+        self._hits += 1
+        self._move_to_front(entry)
+        return entry.value
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        Cache value under key as the most recently used entry, then evict
+        least recently used entries until the cache is within its budgets.
+        ttl overrides the default lifetime of this entry.
+        A value larger than max_bytes on its own is not cached.
+        """
+        size = self._sizeof(key, value)
+        if self._max_bytes is not None and size > self._max_bytes:
+            self.pop(key, None)
+            return
+
+        # A single probe finds the existing entry or inserts the new one
+        candidate = _CacheEntry(key, value)
+        entry = self._entries.setdefault(key, candidate)
+        if entry is candidate:
+            self._link_front(entry)
+
+            # One entry over the limit, the new one is at the front so it stays
+            if self._max_entries is not None and self._entries.get_size() > self._max_entries:
+                self._evict()
+        else:
+            entry.value = value
+            self._bytes -= entry.size
+            self._move_to_front(entry)
+
+        entry.size = size
+        self._bytes += size
+
+        ttl = self._ttl if ttl is None else ttl
+        entry.expires = None if ttl is None else self._clock() + ttl
+
+        while self._max_bytes is not None and self._bytes > self._max_bytes:
+            self._evict()
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checking a live key without changing its recency.
+        """
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry)
+
+    def remove(self, key: str) -> None:
+        """
+        Drop key from the cache. If the key is not present, do nothing.
+        """
+        self.pop(key, None)
+
+    def pop(self, key: str, default: object = _MISSING) -> object:
+        """
+        Remove key and return its value. A missing or expired key returns default,
+        or raises KeyError when no default is given.
+        """
+        entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            self._unlink(entry)
+            self._bytes -= entry.size
+            if not self._expired(entry):
+                return entry.value
+            self._expirations += 1
+
+        if default is _MISSING:
+            raise KeyError(key)
+
+        return default
+
+    def purge_expired(self) -> int:
+        """
+        Drop every expired entry and return how many there were.
+        Walks the whole recency list, since lifetimes differ between entries.
+        """
+        expired = [entry for entry in self._entries_by_recency() if self._expired(entry)]
+        for entry in expired:
+            self._drop(entry)
+
+        self._expirations += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        """
+        Empty the cache, the counters are kept.
+        """
+        self._entries.clear()
+        self._head.newer = self._head
+        self._head.older = self._head
+        self._bytes = 0
+
+    def keys(self):
+        """
+        Lazily yield every cached key, most recently used first.
+        """
+        for entry in self._entries_by_recency():
+            yield entry.key
+
+    def items(self):
+        """
+        Lazily yield every cached (key, value) pair, most recently used first.
+        """
+        for entry in self._entries_by_recency():
+            yield entry.key, entry.value
+
+    def __iter__(self):
+        """
+        Iterate over the cached keys, most recently used first.
+        """
+        return self.keys()
+
+    def get_stats(self) -> dict:
+        """
+        Presenting the hit, miss, eviction and expiration counters.
+        """
+        lookups = self._hits + self._misses
+        return {
+            'size': self._entries.get_size(),
+            'bytes': self._bytes,
+            'max_entries': self._max_entries,
+            'max_bytes': self._max_bytes,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_ratio': self._hits / lookups if lookups else None,
+            'evictions': self._evictions,
+            'expirations': self._expirations,
+        }
+
+    def _expired(self, entry: _CacheEntry) -> bool:
+        """
+        Checking whether the lifetime of entry has run out.
+        """
+        return entry.expires is not None and self._clock() >= entry.expires
+
+    def _evict(self) -> None:
+        """
+        Drop the least recently used entry.
+        """
+        entry = self._head.newer
+        if entry is self._head:
+            return
+
+        # An entry past its lifetime is counted as expired, not evicted
+        if self._expired(entry):
+            self._expirations += 1
+        else:
+            self._evictions += 1
+        self._drop(entry)
+
+    def _drop(self, entry: _CacheEntry) -> None:
+        """
+        Remove entry from the map and the recency list.
+        """
+        self._entries.remove(entry.key)
+        self._unlink(entry)
+        self._bytes -= entry.size
+
+    def _link_front(self, entry: _CacheEntry) -> None:
+        """
+        Insert entry as the most recently used one.
+        """
+        head = self._head
+        entry.newer = head
+        entry.older = head.older
+        head.older.newer = entry
+        head.older = entry
+
+    def _unlink(self, entry: _CacheEntry) -> None:
+        """
+        Take entry out of the recency list.
+        """
+        entry.newer.older = entry.older
+        entry.older.newer = entry.newer
+        entry.newer = None
+        entry.older = None
+
+    def _move_to_front(self, entry: _CacheEntry) -> None:
+        """
+        Mark entry as the most recently used one.
+        """
+        if self._head.older is not entry:
+            self._unlink(entry)
+            self._link_front(entry)
+
+    def _entries_by_recency(self):
+        """
+        Yield the entries from the most to the least recently used.
+        """
+        entry = self._head.older
+        while entry is not self._head:
+            older = entry.older
+            yield entry
+            entry = older
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nLRUCache example 1")
+    print("------------------")
+    cache = LRUCache(max_entries=3)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, key.upper())
+    cache.get('a')
+    cache.put('d', 'D')
+    print(list(cache.items()), cache.get('b'), cache.contains_key('a'))
+    cache.put('c', 'C2')
+    cache.put('e', 'E')
+    print(list(cache.keys()), cache.pop('c'), cache.pop('zz', None), cache.get_size())
+    print(cache.get_stats())
+
+    print("\nLRUCache example 2")
+    print("------------------")
+    now = [0.0]
+    cache = LRUCache(max_entries=100, ttl=10, clock=lambda: now[0])
+    cache.put('short', 1, ttl=2)
+    cache.put('default', 2)
+    cache.put('long', 3, ttl=60)
+    now[0] = 5
+    print(cache.get('short'), cache.get('default'), cache.get('long'), cache.get_size())
+    now[0] = 30
+    print(cache.purge_expired(), list(cache.keys()), cache.get_stats()['expirations'])
+
+    print("\nLRUCache example 3")
+    print("------------------")
+    cache = LRUCache(max_bytes=4000, sizeof=lambda key, value: len(key) + len(value))
+    for i in range(100):
+        cache.put('page' + str(i), 'x' * 100)
+        cache.get('page0')
+    stats = cache.get_stats()
+    print(stats['size'], stats['bytes'], stats['evictions'], cache.contains_key('page0'),
+          cache.contains_key('page1'), round(stats['hit_ratio'], 2))
+    cache.put('huge', 'x' * 5000)
+    print(cache.contains_key('huge'), cache.get_size())
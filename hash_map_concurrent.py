@@ -0,0 +1,405 @@
+# Description: Thread-safe HashMap using separate chaining with lock striping.
+# Buckets are guarded by a fixed number of stripe locks (bucket index modulo the
+# stripe count), so writers on different stripes do not wait on each other.
+# A resize takes every stripe lock and swaps in a freshly built table, while
+# readers walk the chains without any lock.
+# It must be run in average O(1) runtime complexity.
+
+import random
+import sys
+import threading
+
+from a6_include import (DynamicArray, LinkedList,
+                        hash_function_1, hash_function_2)
+
+
+class HashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16) -> None:
+        """
+        Initialize new thread-safe HashMap that uses
+        separate chaining for collision resolution
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+
+        capacity = self._next_prime(capacity)
+
+        # Buckets and capacity are swapped together so a reader never mixes them
+        self._table = (self._new_buckets(capacity), capacity)
+
+        self._hash_function = function
+        self._stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+        # Each stripe counts its own pairs, only the stripe lock holder writes it
+        self._counts = [0] * stripes
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        buckets, capacity = self._table
+        out = ''
+        for i in range(capacity):
+            out += str(i) + ': ' + str(buckets[i]) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number and the find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map, a moment-in-time total while writers are running
+        """
+        return sum(self._counts)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._table[1]
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Creates or updates a key-value pair under the lock of its stripe.
+        If load factor (lambda) is equal to or greater than 1, the table is resized.
+        """
+        hash_code = self._hash_function(key)
+
+        while True:
+            table = self._table
+            buckets, capacity = table
+            index = hash_code % capacity
+            stripe = index % self._stripes
+
+            with self._locks[stripe]:
+                # A resize swapped the table before the lock was taken, retry
+                if self._table is not table:
+                    continue
+
+                bucket_hash = buckets[index]
+                for node in bucket_hash:
+                    if node.hash_code == hash_code and node.key == key:
+                        node.value = value
+                        return
+
+                bucket_hash.insert(key, value)
+
+                # LinkedList.insert places the new node at the head of the chain
+                next(iter(bucket_hash)).hash_code = hash_code
+                self._counts[stripe] += 1
+                break
+
+        # Checking if resizing is needed, outside of the stripe lock
+        if self.get_size() >= capacity:
+            self._grow(capacity)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash table to new capacity while holding every stripe lock.
+        """
+        # Create new_capacity or not
+        if new_capacity < 1:
+            return
+
+        self._lock_all()
+        try:
+            self._rebuild(new_capacity)
+        finally:
+            self._unlock_all()
+
+    def table_load(self) -> float:
+        """
+        It represents the load factor of hash table from computing.
+        """
+        return self.get_size() / self._table[1]
+
+    def empty_buckets(self) -> int:
+        """
+        Check the number of hash table empty buckets.
+        """
+        self._lock_all()
+        try:
+            buckets, capacity = self._table
+            empty_hash = 0
+            for i in range(capacity):
+                if buckets[i].length() == 0:
+                    empty_hash += 1
+        finally:
+            self._unlock_all()
+
+        return empty_hash
+
+    def get(self, key: str) -> object:
+        """
+        Showing the value of key or nothing if no match, without taking a lock.
+        Chains are only changed by reference assignments, which a reader
+        observes either before or after, and a resize never alters the old table.
+        """
+        buckets, capacity = self._table
+        current_node = buckets[self._hash_function(key) % capacity].contains(key)
+        if current_node:
+            return current_node.value
+
+        # Nothing matches
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        True for key in the hash map, False nothing matches.
+        A key stored with the value None is still present. Lock-free, as get().
+        """
+        buckets, capacity = self._table
+        return buckets[self._hash_function(key) % capacity].contains(key) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Hash map removes the target key-value pair under the lock of its stripe.
+        If the key is not present, do nothing.
+        """
+        hash_code = self._hash_function(key)
+
+        while True:
+            table = self._table
+            buckets, capacity = table
+            index = hash_code % capacity
+            stripe = index % self._stripes
+
+            with self._locks[stripe]:
+                # A resize swapped the table before the lock was taken, retry
+                if self._table is not table:
+                    continue
+
+                if buckets[index].remove(key):
+                    self._counts[stripe] -= 1
+                return
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Presenting a consistent snapshot of key-value pairs as tuples in a dynamic array.
+        """
+        result = DynamicArray()
+
+        self._lock_all()
+        try:
+            buckets, capacity = self._table
+            for i in range(capacity):
+                for node in buckets[i]:
+                    result.append((node.key, node.value))
+        finally:
+            self._unlock_all()
+
+        return result
+
+    def clear(self) -> None:
+        """
+        Empty hash map with same capacity.
+        """
+        self._lock_all()
+        try:
+            capacity = self._table[1]
+            self._table = (self._new_buckets(capacity), capacity)
+            self._counts = [0] * self._stripes
+        finally:
+            self._unlock_all()
+
+    def _grow(self, seen_capacity: int) -> None:
+        """
+        Double the table unless another thread already resized it.
+        """
+        self._lock_all()
+        try:
+            if self._table[1] == seen_capacity and sum(self._counts) >= seen_capacity:
+                self._rebuild(seen_capacity * 2)
+        finally:
+            self._unlock_all()
+
+    def _rebuild(self, new_capacity: int) -> None:
+        """
+        Build a new table from cached hash codes and publish it in one assignment.
+        The caller must hold every stripe lock.
+        """
+        size = sum(self._counts)
+
+        # Make sure the prime number in new_capacity
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        # Keep growing while the pairs would not fit under the load factor
+        while size > new_capacity:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        # Build aside, the old table stays intact for lock-free readers
+        prev_buckets, prev_capacity = self._table
+        buckets = self._new_buckets(new_capacity)
+        counts = [0] * self._stripes
+        for i in range(prev_capacity):
+            for node in prev_buckets[i]:
+                index = node.hash_code % new_capacity
+                bucket_hash = buckets[index]
+                bucket_hash.insert(node.key, node.value)
+                next(iter(bucket_hash)).hash_code = node.hash_code
+                counts[index % self._stripes] += 1
+
+        self._counts = counts
+        self._table = (buckets, new_capacity)
+
+    def _lock_all(self) -> None:
+        """
+        Acquire every stripe lock, always in the same order.
+        """
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """
+        Release every stripe lock.
+        """
+        for lock in reversed(self._locks):
+            lock.release()
+
+    @staticmethod
+    def _new_buckets(capacity: int) -> DynamicArray:
+        """
+        Create a dynamic array of empty chains.
+        """
+        buckets = DynamicArray()
+        for _ in range(capacity):
+            buckets.append(LinkedList())
+        return buckets
+
+
+def stress_test(threads: int = 8, operations: int = 20000, shared_keys: int = 64) -> bool:
+    """
+    Hammer one small map from many threads and check that it behaves linearizably:
+    - private keys, written by a single thread, always read back that thread's last write
+    - shared keys never show a writer's older value after a newer one was seen
+    - the final size matches the pairs every thread expects to be left
+    Returns True when no violation is seen.
+    """
+    hash_map = HashMap(3, hash_function_2, stripes=4)
+    failures = []
+    private_left = [0] * threads
+
+    # Every shared key exists for the whole run, so reads always see some value
+    for k in range(shared_keys):
+        hash_map.put('shared' + str(k), (-1, 0))
+
+    def worker(thread_id: int) -> None:
+        rng = random.Random(thread_id)
+        expected = {}
+        last_seen = {}
+
+        for seq in range(1, operations + 1):
+            choice = rng.random()
+            if choice < 0.3:
+                key = 't' + str(thread_id) + '-' + str(rng.randrange(500))
+                hash_map.put(key, seq)
+                expected[key] = seq
+            elif choice < 0.45:
+                key = 't' + str(thread_id) + '-' + str(rng.randrange(500))
+                hash_map.remove(key)
+                expected.pop(key, None)
+            elif choice < 0.7:
+                key = 't' + str(thread_id) + '-' + str(rng.randrange(500))
+                if hash_map.get(key) != expected.get(key):
+                    failures.append(('private', thread_id, key))
+            elif choice < 0.85:
+                hash_map.put('shared' + str(rng.randrange(shared_keys)), (thread_id, seq))
+            else:
+                key = 'shared' + str(rng.randrange(shared_keys))
+                writer, value_seq = hash_map.get(key)
+                if value_seq < last_seen.get((key, writer), 0):
+                    failures.append(('shared', thread_id, key))
+                last_seen[(key, writer)] = value_seq
+
+        private_left[thread_id] = len(expected)
+
+    # Switch threads far more often than usual to provoke interleavings
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    if hash_map.get_size() != sum(private_left) + shared_keys:
+        failures.append(('size', hash_map.get_size(), sum(private_left) + shared_keys))
+    if hash_map.get_keys_and_values().length() != hash_map.get_size():
+        failures.append(('snapshot', hash_map.get_size()))
+
+    for failure in failures[:10]:
+        print('violation:', failure)
+
+    return not failures
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\ncontains_key / remove example 1")
+    print("-------------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    for key in keys[::2]:
+        m.remove(str(key))
+    print(result, m.get_size(), m.get_capacity())
+
+    print("\nstress test example 1")
+    print("---------------------")
+    print(stress_test())
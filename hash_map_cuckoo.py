@@ -0,0 +1,588 @@
+# Description: The hash table uses Cuckoo hashing over two tables, with both slots of
+# a key computed from its hash_function_1 and hash_function_2 codes. Every key sits in
+# one of its two slots, so a lookup reads at most two slots plus the stash. An insert
+# whose slots are both taken evicts an occupant to its other slot, for a bounded number
+# of steps; a key left over by a cycle goes to the stash, and an overflowing stash makes
+# the tables rebuild with new index parameters. Keys whose two hash codes both equal
+# those of two other keys can never all fit in the tables, so the stash is a Separate
+# Chaining HashMap rather than a list and stays fast when such keys pile up.
+# It must be run in average O(1) runtime complexity.
+
+import random
+
+import hash_map_sc
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+
+# Live entries over all slots of both tables before put() grows the map.
+# Two-table cuckoo hashing stops converging just under half full.
+_MAX_LOAD = 0.45
+
+# Keys left over by eviction cycles that are kept before the tables are rebuilt,
+# the limit doubles with the stash when a rebuild cannot shrink it
+_STASH_SIZE = 4
+
+# Default of pop(), tells "no default given" apart from a default of None
+_MISSING = object()
+
+
+class HashMap:
+    def __init__(self, capacity: int, function=hash_function_1,
+                 function2=hash_function_2) -> None:
+        """
+        Initialize new HashMap that uses
+        cuckoo hashing for collision resolution.
+        capacity counts the slots of both tables together.
+        """
+        # Each table has a prime number of slots
+        self._table_capacity = self._next_prime(max(1, -(-capacity // 2)))
+        self._table1 = self._new_table(self._table_capacity)
+        self._table2 = self._new_table(self._table_capacity)
+
+        self._hash_function = function
+        self._hash_function2 = function2
+        self._size = 0
+
+        # key -> entry for keys that have no table slot
+        self._stash = self._new_stash()
+        self._stash_limit = _STASH_SIZE
+
+        # Either hash function alone has only a few hundred distinct codes on
+        # short strings, too few to fill a table, so each slot index mixes both:
+        # (code1 * a + code2 * b + c) % capacity, with a, b, c drawn per table.
+        # A rebuild after a cycle draws new ones.
+        self._random = random.Random(0)
+        self._draw_parameters()
+
+        # Bumped by every change of the set of keys, checked by live iterators
+        self._version = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output,
+        the second table continues the slot numbers of the first
+        """
+        out = ''
+        for i in range(self._table_capacity):
+            out += str(i) + ': ' + str(self._table1[i]) + '\n'
+        for i in range(self._table_capacity):
+            out += str(self._table_capacity + i) + ': ' + str(self._table2[i]) + '\n'
+        for hash_item in self._stash.values():
+            out += 'stash: ' + str(hash_item) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, the slots of both tables
+        """
+        return 2 * self._table_capacity
+
+    def get_stash_size(self) -> int:
+        """
+        Return number of keys that are in the stash instead of a table slot
+        """
+        return self._stash.get_size()
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Insert or update a key-value pair.
+        If the load factor would pass _MAX_LOAD, the table is resized first.
+        """
+        self._make_room()
+        self._insert(key, value, self._hash_function(key), self._hash_function2(key))
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Add delta to the value of key, starting from 0 for a new key,
+        and return the new value.
+        """
+        self._make_room()
+        hash_item = self._insert(key, 0, self._hash_function(key), self._hash_function2(key),
+                                 replace=False)
+        hash_item.value += delta
+        return hash_item.value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Return the value of key, inserting default first if key is missing.
+        """
+        self._make_room()
+        return self._insert(key, default, self._hash_function(key), self._hash_function2(key),
+                            replace=False).value
+
+    def put_many(self, items) -> None:
+        """
+        Insert or update every (key, value) pair of an iterable.
+        The table is sized once up front, so no load check or resize happens per pair.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        # Worst case every pair is a new key
+        self.reserve(self._size + len(pairs))
+
+        hash_function = self._hash_function
+        hash_function2 = self._hash_function2
+        for key, value in pairs:
+            self._insert(key, value, hash_function(key), hash_function2(key))
+
+    @classmethod
+    def from_items(cls, items, function=hash_function_1,
+                   function2=hash_function_2) -> "HashMap":
+        """
+        Build a new hash map from an iterable of (key, value) pairs,
+        allocating the final capacity directly.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        hash_map = cls(int(len(pairs) / _MAX_LOAD) + 1, function, function2)
+        hash_map.put_many(pairs)
+        return hash_map
+
+    def reserve(self, count: int) -> None:
+        """
+        Resize the table once so that count entries fit under _MAX_LOAD.
+        The table never shrinks here.
+        """
+        if count / self.get_capacity() > _MAX_LOAD:
+            self.resize_table(int(count / _MAX_LOAD) + 1)
+
+    def _insert(self, key: str, value: object, hash_code: int, hash_code2: int,
+                replace: bool = True) -> HashEntry:
+        """
+        Insert or update a key-value pair without checking the load factor
+        and return its entry. An existing value is kept unless replace is set.
+        """
+        hash_item = self._find_entry(key, hash_code, hash_code2)
+        if hash_item is not None:
+            if replace:
+                hash_item.value = value
+            return hash_item
+
+        hash_item = HashEntry(key, value)
+        hash_item.hash_code = hash_code
+        hash_item.hash_code2 = hash_code2
+        self._size += 1
+        self._version += 1
+
+        # A key left over by an eviction cycle waits in the stash
+        homeless = self._place(hash_item)
+        if homeless is not None:
+            self._stash.put(homeless.key, homeless)
+            if self._stash.get_size() > self._stash_limit:
+                self._rebuild_after_cycle()
+
+        return hash_item
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Modify the capacity of both tables together and place every entry again
+        """
+        # Check for using the new capacity correctly
+        if new_capacity < self._size:
+            return
+
+        # Keep growing while the entries would not fit under the load factor
+        table_capacity = self._next_prime(max(1, -(-new_capacity // 2)))
+        while self._size / (2 * table_capacity) > _MAX_LOAD:
+            table_capacity = self._next_prime(table_capacity * 2)
+
+        self._rebuild(table_capacity)
+
+    def table_load(self) -> float:
+        """
+        Presenting the hash table load factor from calculating.
+        """
+        return self._size / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        The result is how many empty slots both tables have.
+        """
+        empty_hash = 0
+        for i in range(self._table_capacity):
+            if self._table1[i] is None:
+                empty_hash += 1
+            if self._table2[i] is None:
+                empty_hash += 1
+
+        return empty_hash
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        Presenting the value from provided key, or default if nothing.
+        Reads the slot of each table and then the stash, if it holds anything.
+        """
+        hash_item = self._find_entry(key, self._hash_function(key), self._hash_function2(key))
+        if hash_item is None:
+            return default
+
+        return hash_item.value
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Presenting the value of every key of an iterable in a dynamic array,
+        None for missing keys.
+        """
+        result = DynamicArray()
+        for key in keys:
+            result.append(self.get(key))
+
+        return result
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Presenting contains_key of every key of an iterable in a dynamic array.
+        """
+        result = DynamicArray()
+        for key in keys:
+            result.append(self.contains_key(key))
+
+        return result
+
+    def contains_key(self, key: str) -> bool:
+        """
+        True for key in the hash map, False if nothing.
+        """
+        if self._size == 0:
+            return False
+
+        return self._find_entry(key, self._hash_function(key), self._hash_function2(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the target key. If the key is not present, do nothing.
+        """
+        self.pop(key, None)
+
+    def pop(self, key: str, default: object = _MISSING) -> object:
+        """
+        Remove key and return its value. A missing key returns default,
+        or raises KeyError when no default is given.
+        """
+        hash_code = self._hash_function(key)
+        hash_code2 = self._hash_function2(key)
+
+        index = self._index1(hash_code, hash_code2)
+        hash_item = self._table1[index]
+        if hash_item is not None and hash_item.hash_code == hash_code and hash_item.key == key:
+            self._table1[index] = None
+            self._size -= 1
+            self._version += 1
+            return hash_item.value
+
+        index = self._index2(hash_code, hash_code2)
+        hash_item = self._table2[index]
+        if hash_item is not None and hash_item.hash_code2 == hash_code2 and hash_item.key == key:
+            self._table2[index] = None
+            self._size -= 1
+            self._version += 1
+            return hash_item.value
+
+        if self._stash.get_size() > 0:
+            hash_item = self._stash.pop(key, None)
+            if hash_item is not None:
+                self._size -= 1
+                self._version += 1
+                return hash_item.value
+
+        if default is _MISSING:
+            raise KeyError(key)
+
+        return default
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Presenting all key-value pairs as tuple in a dynamic array.
+        """
+        result = DynamicArray()
+        for hash_item in self._entries():
+            result.append((hash_item.key, hash_item.value))
+
+        return result
+
+    def clear(self) -> None:
+        """
+        Empty hash map without any changes.
+        """
+        self._size = 0
+        self._version += 1
+        self._table1 = self._new_table(self._table_capacity)
+        self._table2 = self._new_table(self._table_capacity)
+        self._stash = self._new_stash()
+        self._stash_limit = _STASH_SIZE
+
+    def keys(self):
+        """
+        Lazily yield every stored key.
+        """
+        for hash_item in self:
+            yield hash_item.key
+
+    def values(self):
+        """
+        Lazily yield every stored value.
+        """
+        for hash_item in self:
+            yield hash_item.value
+
+    def items(self):
+        """
+        Lazily yield every stored (key, value) pair.
+        """
+        for hash_item in self:
+            yield hash_item.key, hash_item.value
+
+    def __iter__(self):
+        """
+        Use only stored item for iterating. Every call returns its own iterator.
+        Raises RuntimeError if a key is added or removed while iterating.
+        """
+        version = self._version
+
+        for hash_item in self._entries():
+            yield hash_item
+
+            if self._version != version:
+                raise RuntimeError("HashMap changed size during iteration")
+
+    def _make_room(self) -> None:
+        """
+        Grow both tables before an insert that would pass _MAX_LOAD.
+        """
+        if (self._size + 1) / self.get_capacity() > _MAX_LOAD:
+            self.resize_table(self.get_capacity() * 2)
+
+    def _index1(self, hash_code: int, hash_code2: int) -> int:
+        """
+        Slot of a key in the first table.
+        """
+        a, b, c = self._parameters1
+        return (hash_code * a + hash_code2 * b + c) % self._table_capacity
+
+    def _index2(self, hash_code: int, hash_code2: int) -> int:
+        """
+        Slot of a key in the second table.
+        """
+        a, b, c = self._parameters2
+        return (hash_code * a + hash_code2 * b + c) % self._table_capacity
+
+    def _draw_parameters(self) -> None:
+        """
+        Pick new index parameters for both tables.
+        """
+        draw = self._random.randrange
+        self._parameters1 = (draw(1, 1 << 61), draw(1, 1 << 61), draw(1 << 61))
+        self._parameters2 = (draw(1, 1 << 61), draw(1, 1 << 61), draw(1 << 61))
+
+    def _find_entry(self, key: str, hash_code: int, hash_code2: int) -> object:
+        """
+        Return the entry for key, or None.
+        """
+        hash_item = self._table1[self._index1(hash_code, hash_code2)]
+        if hash_item is not None and hash_item.hash_code == hash_code and hash_item.key == key:
+            return hash_item
+
+        hash_item = self._table2[self._index2(hash_code, hash_code2)]
+        if hash_item is not None and hash_item.hash_code2 == hash_code2 and hash_item.key == key:
+            return hash_item
+
+        if self._stash.get_size() > 0:
+            return self._stash.get(key)
+
+        return None
+
+    def _place(self, entry: HashEntry) -> object:
+        """
+        Put entry into a free slot of either table, evicting occupants to their
+        other table when both are taken. Returns None once everything has a slot,
+        or the entry left over when the eviction bound is reached.
+        """
+        table1 = self._table1
+        table2 = self._table2
+
+        index1 = self._index1(entry.hash_code, entry.hash_code2)
+        if table1[index1] is None:
+            table1[index1] = entry
+            return None
+
+        index2 = self._index2(entry.hash_code, entry.hash_code2)
+        if table2[index2] is None:
+            table2[index2] = entry
+            return None
+
+        # Both slots already hold keys with the same two hash codes,
+        # evicting them would only move the three keys in a circle
+        hash_item = table1[index1]
+        other_item = table2[index2]
+        if (hash_item.hash_code == other_item.hash_code == entry.hash_code
+                and hash_item.hash_code2 == other_item.hash_code2 == entry.hash_code2):
+            return entry
+
+        # Long enough for the usual path length, short enough to stop on a cycle
+        for _ in range(4 * self._table_capacity.bit_length()):
+            index1 = self._index1(entry.hash_code, entry.hash_code2)
+            entry, table1[index1] = table1[index1], entry
+            if entry is None:
+                return None
+
+            index2 = self._index2(entry.hash_code, entry.hash_code2)
+            entry, table2[index2] = table2[index2], entry
+            if entry is None:
+                return None
+
+        return entry
+
+    def _rebuild_after_cycle(self) -> None:
+        """
+        The stash overflowed: draw new index parameters and place every entry
+        again, growing the tables too unless their slots are mostly empty.
+        """
+        table_capacity = self._table_capacity
+        placed = self._size - self._stash.get_size()
+        if placed / self.get_capacity() >= _MAX_LOAD / 2:
+            table_capacity = self._next_prime(table_capacity * 2)
+
+        self._draw_parameters()
+        self._rebuild(table_capacity)
+
+        # Keys whose two hash codes both collide cannot be helped by new
+        # parameters, so they raise the limit instead of forcing more rebuilds
+        self._stash_limit = max(_STASH_SIZE, 2 * self._stash.get_size())
+
+    def _rebuild(self, table_capacity: int) -> None:
+        """
+        Place every entry into new tables of table_capacity slots each, from the
+        cached hash codes. Keys left over by a cycle go to the stash.
+        """
+        entries = list(self._entries())
+
+        self._table_capacity = table_capacity
+        self._table1 = self._new_table(table_capacity)
+        self._table2 = self._new_table(table_capacity)
+        self._stash = self._new_stash()
+        self._version += 1
+
+        for hash_item in entries:
+            homeless = self._place(hash_item)
+            if homeless is not None:
+                self._stash.put(homeless.key, homeless)
+
+    def _entries(self):
+        """
+        Yield the entries of both tables, then the stash.
+        """
+        for table in (self._table1, self._table2):
+            for i in range(self._table_capacity):
+                hash_item = table[i]
+                if hash_item is not None:
+                    yield hash_item
+
+        yield from list(self._stash.values())
+
+    def _new_stash(self) -> hash_map_sc.HashMap:
+        """
+        Create an empty stash.
+        """
+        return hash_map_sc.HashMap(_STASH_SIZE, self._hash_function2)
+
+    @staticmethod
+    def _new_table(capacity: int) -> DynamicArray:
+        """
+        Create a table of empty slots.
+        """
+        return DynamicArray([None] * capacity)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(53)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(),
+                  m.get_capacity(), m.get_stash_size())
+
+    print("\nget / remove example 1")
+    print("----------------------")
+    m = HashMap(79)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.get(str(key)) == key * 42
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    for key in keys[::2]:
+        m.remove(str(key))
+    for key in keys[1::2]:
+        result &= m.get(str(key)) == key * 42
+    print(result, m.get_size(), m.get_capacity())
+
+    print("\ncollision example 1")
+    print("-------------------")
+    # Anagrams share their hash_function_1 code, so most of them
+    # can only live in the second table or the stash
+    m = HashMap(11)
+    words = ['listen', 'silent', 'enlist', 'tinsel', 'inlets', 'elints']
+    for word in words:
+        m.put(word, len(word))
+    print(m.get_size(), m.get_capacity(), m.get_stash_size(),
+          all(m.get(word) == 6 for word in words))
+
+    print("\niterator example 1")
+    print("------------------")
+    m = HashMap(10)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
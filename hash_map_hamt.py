@@ -0,0 +1,454 @@
+# Description: Persistent (immutable) hash map stored as a hash array mapped trie.
+# Each trie level takes the next 5 bits of the key's hash code and keeps only the
+# children that exist, packed behind a 32-bit bitmap. put() and remove() copy the
+# short path from the root to the changed leaf and share everything else with the
+# version they started from, so every version stays valid and taking a snapshot
+# is just keeping a reference. Keys whose hash codes are equal end in a collision node.
+
+from a6_include import (DynamicArray,
+                        hash_function_1, hash_function_2)
+
+# Hash bits consumed per trie level, and the mask selecting them
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+
+# Default of pop(), tells "no default given" apart from a default of None
+_MISSING = object()
+
+
+def _bit_position(bitmap: int, bit: int) -> int:
+    """
+    Return the index in a packed child array of the child marked by bit.
+    """
+    return bin(bitmap & (bit - 1)).count('1')
+
+
+class _Leaf:
+    """
+    One key-value pair with the full hash code of its key.
+    """
+    __slots__ = ('hash_code', 'key', 'value')
+
+    def __init__(self, hash_code: int, key: str, value: object) -> None:
+        self.hash_code = hash_code
+        self.key = key
+        self.value = value
+
+
+class _CollisionNode:
+    """
+    Leaves whose keys share one full hash code, searched by key.
+    """
+    __slots__ = ('hash_code', 'leaves')
+
+    def __init__(self, hash_code: int, leaves: tuple) -> None:
+        self.hash_code = hash_code
+        self.leaves = leaves
+
+    def find(self, hash_code: int, shift: int, key: str) -> object:
+        """
+        Return the leaf holding key, or None.
+        """
+        if hash_code == self.hash_code:
+            for leaf in self.leaves:
+                if leaf.key == key:
+                    return leaf
+
+        return None
+
+    def assoc(self, leaf: _Leaf, shift: int) -> tuple:
+        """
+        Return (node with leaf added or replaced, whether a key was added).
+        """
+        if leaf.hash_code != self.hash_code:
+            # A different hash code goes beside this node one level down
+            node = _BitmapNode(1 << ((self.hash_code >> shift) & _MASK), (self,))
+            return node.assoc(leaf, shift)
+
+        for i, current in enumerate(self.leaves):
+            if current.key == leaf.key:
+                if current.value is leaf.value:
+                    return self, False
+                leaves = self.leaves[:i] + (leaf,) + self.leaves[i + 1:]
+                return _CollisionNode(self.hash_code, leaves), False
+
+        return _CollisionNode(self.hash_code, self.leaves + (leaf,)), True
+
+    def without(self, hash_code: int, shift: int, key: str) -> object:
+        """
+        Return the node without key: itself when key is missing,
+        the last leaf once only one is left.
+        """
+        if hash_code != self.hash_code:
+            return self
+
+        for i, leaf in enumerate(self.leaves):
+            if leaf.key == key:
+                leaves = self.leaves[:i] + self.leaves[i + 1:]
+                if len(leaves) == 1:
+                    return leaves[0]
+                return _CollisionNode(self.hash_code, leaves)
+
+        return self
+
+    def leaves_of(self):
+        """
+        Yield every leaf below this node.
+        """
+        yield from self.leaves
+
+
+class _BitmapNode:
+    """
+    One trie level: bit n of bitmap is set when the child for the 5-bit hash chunk n
+    exists, and the children are packed in bit order. A child is a _Leaf,
+    a _CollisionNode or the _BitmapNode of the next level.
+    """
+    __slots__ = ('bitmap', 'children')
+
+    def __init__(self, bitmap: int, children: tuple) -> None:
+        self.bitmap = bitmap
+        self.children = children
+
+    def find(self, hash_code: int, shift: int, key: str) -> object:
+        """
+        Return the leaf holding key, or None.
+        """
+        node = self
+        while True:
+            bit = 1 << ((hash_code >> shift) & _MASK)
+            if not node.bitmap & bit:
+                return None
+
+            child = node.children[_bit_position(node.bitmap, bit)]
+            if type(child) is _Leaf:
+                if child.hash_code == hash_code and child.key == key:
+                    return child
+                return None
+
+            if type(child) is _CollisionNode:
+                return child.find(hash_code, shift + _BITS, key)
+
+            node = child
+            shift += _BITS
+
+    def assoc(self, leaf: _Leaf, shift: int) -> tuple:
+        """
+        Return (node with leaf added or replaced, whether a key was added),
+        copying only this node and the path below it that changes.
+        """
+        bit = 1 << ((leaf.hash_code >> shift) & _MASK)
+        position = _bit_position(self.bitmap, bit)
+
+        # A free slot takes the leaf directly
+        if not self.bitmap & bit:
+            children = self.children[:position] + (leaf,) + self.children[position:]
+            return _BitmapNode(self.bitmap | bit, children), True
+
+        child = self.children[position]
+        if type(child) is _Leaf:
+            if child.key == leaf.key:
+                if child.value is leaf.value:
+                    return self, False
+                added = False
+                child = leaf
+            else:
+                added = True
+                child = _merge_leaves(child, leaf, shift + _BITS)
+        else:
+            new_child, added = child.assoc(leaf, shift + _BITS)
+            if new_child is child:
+                return self, False
+            child = new_child
+
+        children = self.children[:position] + (child,) + self.children[position + 1:]
+        return _BitmapNode(self.bitmap, children), added
+
+    def without(self, hash_code: int, shift: int, key: str) -> object:
+        """
+        Return the node without key: itself when key is missing, None when it
+        becomes empty, or its last leaf, which the parent can hold directly.
+        """
+        bit = 1 << ((hash_code >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return self
+
+        position = _bit_position(self.bitmap, bit)
+        child = self.children[position]
+        if type(child) is _Leaf:
+            if child.hash_code != hash_code or child.key != key:
+                return self
+            new_child = None
+        else:
+            new_child = child.without(hash_code, shift + _BITS, key)
+            if new_child is child:
+                return self
+
+        if new_child is not None:
+            children = self.children[:position] + (new_child,) + self.children[position + 1:]
+
+            # A lone leaf moves up into the parent
+            if len(children) == 1 and type(new_child) is _Leaf and shift > 0:
+                return new_child
+            return _BitmapNode(self.bitmap, children)
+
+        children = self.children[:position] + self.children[position + 1:]
+        if not children:
+            return None
+        if len(children) == 1 and type(children[0]) is _Leaf and shift > 0:
+            return children[0]
+        return _BitmapNode(self.bitmap ^ bit, children)
+
+    def leaves_of(self):
+        """
+        Yield every leaf below this node.
+        """
+        for child in self.children:
+            if type(child) is _Leaf:
+                yield child
+            else:
+                yield from child.leaves_of()
+
+
+def _merge_leaves(first: _Leaf, second: _Leaf, shift: int) -> object:
+    """
+    Return the smallest subtree at shift holding two leaves of different keys.
+    """
+    if first.hash_code == second.hash_code:
+        return _CollisionNode(first.hash_code, (first, second))
+
+    first_bit = 1 << ((first.hash_code >> shift) & _MASK)
+    second_bit = 1 << ((second.hash_code >> shift) & _MASK)
+
+    # Same chunk at this level, the codes differ further down
+    if first_bit == second_bit:
+        return _BitmapNode(first_bit, (_merge_leaves(first, second, shift + _BITS),))
+
+    if first_bit < second_bit:
+        return _BitmapNode(first_bit | second_bit, (first, second))
+    return _BitmapNode(first_bit | second_bit, (second, first))
+
+
+def _build(leaves: list, shift: int) -> object:
+    """
+    Return the subtree at shift holding leaves of distinct keys, built bottom up
+    in one pass without copying any path.
+    """
+    if len(leaves) == 1:
+        return leaves[0]
+
+    hash_code = leaves[0].hash_code
+    if all(leaf.hash_code == hash_code for leaf in leaves):
+        return _CollisionNode(hash_code, tuple(leaves))
+
+    groups = {}
+    for leaf in leaves:
+        groups.setdefault((leaf.hash_code >> shift) & _MASK, []).append(leaf)
+
+    bitmap = 0
+    children = []
+    for chunk in sorted(groups):
+        bitmap |= 1 << chunk
+        children.append(_build(groups[chunk], shift + _BITS))
+
+    return _BitmapNode(bitmap, tuple(children))
+
+
+# The empty trie every empty map starts from
+_EMPTY = _BitmapNode(0, ())
+
+
+class HashMap:
+    def __init__(self, function=hash_function_1) -> None:
+        """
+        Initialize an empty persistent HashMap.
+        Every change returns a new HashMap and leaves this one as it was.
+        """
+        self._hash_function = function
+        self._root = _EMPTY
+        self._size = 0
+
+    @classmethod
+    def _version(cls, root: _BitmapNode, size: int, function) -> "HashMap":
+        """
+        Wrap a trie root as a map version.
+        """
+        hash_map = cls.__new__(cls)
+        hash_map._hash_function = function
+        hash_map._root = root
+        hash_map._size = size
+        return hash_map
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> "HashMap":
+        """
+        Return a new version with key set to value.
+        Only the nodes on the path to key are copied, the rest is shared.
+        """
+        leaf = _Leaf(self._hash_function(key), key, value)
+        root, added = self._root.assoc(leaf, 0)
+        if root is self._root:
+            return self
+
+        return self._version(root, self._size + added, self._hash_function)
+
+    def put_many(self, items) -> "HashMap":
+        """
+        Return a new version with every (key, value) pair of an iterable set.
+        """
+        hash_map = self
+        for key, value in items:
+            hash_map = hash_map.put(key, value)
+
+        return hash_map
+
+    @classmethod
+    def from_items(cls, items, function=hash_function_1) -> "HashMap":
+        """
+        Build a map from an iterable of (key, value) pairs in one bottom-up pass.
+        Later pairs win for repeated keys.
+        """
+        pairs = {}
+        for key, value in items:
+            pairs[key] = value
+
+        if not pairs:
+            return cls(function)
+
+        leaves = [_Leaf(function(key), key, value) for key, value in pairs.items()]
+        root = _build(leaves, 0)
+
+        # The root is always a bitmap node, even for a single key
+        if type(root) is not _BitmapNode:
+            root = _BitmapNode(1 << (root.hash_code & _MASK), (root,))
+
+        return cls._version(root, len(leaves), function)
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        Presenting the value of key, or default if it is not present.
+        """
+        leaf = self._root.find(self._hash_function(key), 0, key)
+        return default if leaf is None else leaf.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checking whether key is present.
+        """
+        return self._root.find(self._hash_function(key), 0, key) is not None
+
+    def remove(self, key: str) -> "HashMap":
+        """
+        Return a new version without key, or this one if the key is not present.
+        """
+        root = self._root.without(self._hash_function(key), 0, key)
+        if root is self._root:
+            return self
+
+        if root is None:
+            root = _EMPTY
+        elif type(root) is not _BitmapNode:
+            # A collision node at the root shrank to one leaf
+            root = _BitmapNode(1 << (root.hash_code & _MASK), (root,))
+
+        return self._version(root, self._size - 1, self._hash_function)
+
+    def pop(self, key: str, default: object = _MISSING) -> tuple:
+        """
+        Return (value of key, new version without key). A missing key gives
+        (default, this version), or raises KeyError when no default is given.
+        """
+        leaf = self._root.find(self._hash_function(key), 0, key)
+        if leaf is None:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default, self
+
+        return leaf.value, self.remove(key)
+
+    def snapshot(self) -> "HashMap":
+        """
+        Return a point-in-time view, which is this version itself: it never changes.
+        """
+        return self
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Presenting all key-value pairs as tuple in a dynamic array.
+        """
+        result = DynamicArray()
+        for leaf in self._root.leaves_of():
+            result.append((leaf.key, leaf.value))
+
+        return result
+
+    def keys(self):
+        """
+        Lazily yield every stored key.
+        """
+        for leaf in self._root.leaves_of():
+            yield leaf.key
+
+    def values(self):
+        """
+        Lazily yield every stored value.
+        """
+        for leaf in self._root.leaves_of():
+            yield leaf.value
+
+    def items(self):
+        """
+        Lazily yield every stored (key, value) pair.
+        """
+        for leaf in self._root.leaves_of():
+            yield leaf.key, leaf.value
+
+    def __iter__(self):
+        """
+        Iterate over the stored keys. A version never changes, so iterating
+        is safe while newer versions are being made.
+        """
+        return self.keys()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput / remove example 1")
+    print("----------------------")
+    empty = HashMap()
+    first = empty.put('key1', 10).put('key2', 20)
+    second = first.put('key1', 30).remove('key2')
+    print(empty.get_size(), first.get_size(), second.get_size())
+    print(first.get('key1'), first.get('key2'), second.get('key1'), second.get('key2'))
+    print(second.remove('missing') is second, first.put('key2', first.get('key2')) is first)
+
+    print("\nsnapshot example 1")
+    print("------------------")
+    config = HashMap.from_items((('str' + str(i), i) for i in range(1000)), hash_function_2)
+    snapshot = config.snapshot()
+    config = config.remove('str0').remove('str2').put('str1', 'changed')
+    print(snapshot.get_size(), snapshot.get('str0'), snapshot.get('str1'))
+    print(config.get_size(), config.get('str0'), config.get('str1'))
+    # Only the paths to the three changed keys were copied
+    shared = sum(a is b for a, b in zip(snapshot._root.children, config._root.children))
+    print(shared, len(config._root.children))
+
+    print("\ncollision example 1")
+    print("-------------------")
+    # Every permutation of one string has the same hash_function_1 code
+    m = HashMap(hash_function_1)
+    for key in ('abc', 'acb', 'bac', 'bca', 'cab', 'cba', 'xyz'):
+        m = m.put(key, key.upper())
+    print(m.get_size(), m.get('cab'), sorted(m.keys()))
+    value, m = m.pop('cab')
+    print(value, m.get_size(), m.contains_key('cab'), m.get('cba'), sorted(m.items())[:2])
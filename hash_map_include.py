@@ -0,0 +1,451 @@
+# Description: Helpers shared by the hash map modules.
+# Capacity schedules: a precomputed table of roughly doubling primes, so growing
+# a table never needs a trial-division prime search, and power-of-two rounding.
+# Hash function registry: stable names for the hash functions stored in files.
+# Snapshots: a fixed header, integer columns as packed 64-bit arrays, keys as
+# length-prefixed UTF-8 and only the values pickled.
+# Stats: opt-in operation, probe, chain-length and resize counters of a map.
+# Resize policy: checks of the load factor, growth factor and shrink threshold,
+# and the auto-tuner that moves them from the observed stats.
+
+import pickle
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from a6_include import hash_function_1, hash_function_2
+
+# Accepted capacity_mode values of the hash maps
+#   'prime'        - next prime at or above the requested capacity (trial division)
+#   'prime_table'  - next entry of PRIME_CAPACITIES, growth steps one entry up
+#   'power_of_two' - next power of two at or above the requested capacity
+CAPACITY_MODES = ('prime', 'prime_table', 'power_of_two')
+
+# Smallest prime at or above each power of two from 2 ** 1 to 2 ** 48
+PRIME_CAPACITIES = (
+    2, 5, 11, 17, 37, 67, 131, 257,
+    521, 1031, 2053, 4099, 8209, 16411, 32771, 65537,
+    131101, 262147, 524309, 1048583, 2097169, 4194319, 8388617, 16777259,
+    33554467, 67108879, 134217757, 268435459, 536870923, 1073741827,
+    2147483659, 4294967311, 8589934609, 17179869209, 34359738421,
+    68719476767, 137438953481, 274877906951, 549755813911,
+    1099511627791, 2199023255579, 4398046511119, 8796093022237,
+    17592186044423, 35184372088891, 70368744177679, 140737488355333,
+    281474976710677,
+)
+
+
+def check_capacity_mode(capacity_mode: str) -> None:
+    """
+    Raise ValueError for an unknown capacity mode.
+    """
+    if capacity_mode not in CAPACITY_MODES:
+        raise ValueError("capacity_mode must be one of " + ", ".join(CAPACITY_MODES))
+
+
+def next_table_prime(capacity: int) -> int:
+    """
+    Return the smallest precomputed prime capacity at or above capacity.
+    """
+    index = bisect_left(PRIME_CAPACITIES, capacity)
+    if index == len(PRIME_CAPACITIES):
+        raise ValueError("capacity is beyond the precomputed prime table")
+
+    return PRIME_CAPACITIES[index]
+
+
+def next_power_of_two(capacity: int) -> int:
+    """
+    Return the smallest power of two at or above capacity, at least 2.
+    """
+    return 1 << max(capacity - 1, 1).bit_length()
+
+
+# Hash functions that can be recorded by name in files and snapshots
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+}
+
+
+def hash_function_name(function) -> str:
+    """
+    Return the registered name of a hash function.
+    """
+    for name, registered in HASH_FUNCTIONS.items():
+        if registered is function:
+            return name
+
+    raise ValueError("hash function is not registered in HASH_FUNCTIONS")
+
+
+def resolve_hash_function(name: str):
+    """
+    Return the hash function registered under name.
+    """
+    if name not in HASH_FUNCTIONS:
+        raise ValueError("unknown hash function " + repr(name))
+
+    return HASH_FUNCTIONS[name]
+
+
+# magic, capacity, size, hash function name, capacity mode, flags, integer column count,
+# load factor, growth factor, min load factor (0 for none), auto-tune,
+# memory budget (0 for none), smallest capacity a shrink may reach
+SNAPSHOT_HEADER = struct.Struct('<8sQQ32s16sBBddd?QQ')
+
+# Element count in front of every column
+SNAPSHOT_COUNT = struct.Struct('<Q')
+
+
+def write_snapshot(path: str, magic: bytes, capacity: int, size: int, function,
+                   capacity_mode: str, policy: tuple, columns: tuple, keys: list, values: list,
+                   flags: int = 0) -> None:
+    """
+    Write a table snapshot: the header with the resize policy (load_factor,
+    growth_factor, min_load_factor, auto_tune, memory_budget, min_capacity),
+    every integer column as a count and little-endian unsigned 64-bit values,
+    the keys as a count, their UTF-8 byte lengths and the joined bytes,
+    then the values in one pickle.
+    """
+    load_factor, growth_factor, min_load_factor, auto_tune, memory_budget, min_capacity = policy
+    header = SNAPSHOT_HEADER.pack(magic, capacity, size,
+                                  hash_function_name(function).encode('ascii'),
+                                  capacity_mode.encode('ascii'), flags, len(columns),
+                                  load_factor, growth_factor, min_load_factor or 0.0,
+                                  auto_tune, memory_budget or 0, min_capacity)
+
+    key_bytes = [key.encode('utf-8') for key in keys]
+
+    with open(path, 'wb') as file:
+        file.write(header)
+        for column in columns:
+            _write_array(file, array('Q', column))
+        _write_array(file, array('Q', [len(key) for key in key_bytes]))
+        file.write(b''.join(key_bytes))
+        pickle.dump(values, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_snapshot(path: str, magic: bytes) -> tuple:
+    """
+    Read a snapshot written by write_snapshot and return
+    (capacity, size, function, capacity_mode, flags, policy, columns, keys, values).
+    Only the values are unpickled, so a snapshot must come from a trusted source.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(SNAPSHOT_HEADER.size)
+        if len(header) != SNAPSHOT_HEADER.size or header[:8] != magic:
+            raise ValueError("not a snapshot of this map type: " + path)
+
+        (_, capacity, size, name, capacity_mode, flags, column_count, load_factor,
+         growth_factor, min_load_factor, auto_tune, memory_budget,
+         min_capacity) = SNAPSHOT_HEADER.unpack(header)
+        columns = tuple(_read_array(file, path) for _ in range(column_count))
+
+        keys = []
+        key_lengths = _read_array(file, path)
+        key_bytes = _read_exactly(file, sum(key_lengths), path)
+        start = 0
+        for length in key_lengths:
+            keys.append(key_bytes[start:start + length].decode('utf-8'))
+            start += length
+
+        values = pickle.load(file)
+
+    function = resolve_hash_function(name.rstrip(b'\x00').decode('ascii'))
+    capacity_mode = capacity_mode.rstrip(b'\x00').decode('ascii')
+    policy = (load_factor, growth_factor, min_load_factor or None,
+              auto_tune, memory_budget or None, min_capacity)
+    return capacity, size, function, capacity_mode, flags, policy, columns, keys, values
+
+
+def _write_array(file, column: array) -> None:
+    """
+    Write the element count and little-endian items of an integer array.
+    """
+    if sys.byteorder == 'big':
+        column.byteswap()
+    file.write(SNAPSHOT_COUNT.pack(len(column)))
+    file.write(column.tobytes())
+
+
+def _read_array(file, path: str) -> array:
+    """
+    Read one integer array written by _write_array.
+    """
+    count = SNAPSHOT_COUNT.unpack(_read_exactly(file, SNAPSHOT_COUNT.size, path))[0]
+    column = array('Q')
+    column.frombytes(_read_exactly(file, count * column.itemsize, path))
+    if sys.byteorder == 'big':
+        column.byteswap()
+
+    return column
+
+
+def _read_exactly(file, length: int, path: str) -> bytes:
+    """
+    Read length bytes, a shorter read means a truncated snapshot.
+    """
+    data = file.read(length)
+    if len(data) != length:
+        raise ValueError("truncated snapshot: " + path)
+
+    return data
+
+
+# Probe counts at or above this share the last slot of the probe histogram
+PROBE_HISTOGRAM_SIZE = 32
+
+
+class HashMapStats:
+    """
+    Counters kept by a hash map created with stats=True.
+    Every counter is updated in place by the operation that changes it,
+    so snapshot() never scans the table.
+    """
+    def __init__(self, capacity: int = 0) -> None:
+        """
+        Start with every counter at zero and capacity empty chains
+        """
+        self.gets = 0
+        self.hits = 0
+        self.puts = 0
+        self.inserts = 0
+        self.removes = 0
+        self.removed = 0
+
+        # Open addressing only: slots visited per operation
+        self.get_probes = 0
+        self.put_probes = 0
+        self.remove_probes = 0
+        self.max_probes = 0
+        self.probe_histogram = [0] * PROBE_HISTOGRAM_SIZE
+
+        self.resizes = 0
+        self.resize_seconds = 0.0
+
+        # Separate chaining only: chain_histogram[n] is the number of chains of length n
+        self.chain_histogram = [capacity]
+
+    def record_get(self, hit: bool, probes: int = 0) -> None:
+        """
+        Count one lookup, a hit or a miss.
+        """
+        self.gets += 1
+        if hit:
+            self.hits += 1
+        if probes:
+            self.get_probes += probes
+            self._record_probes(probes)
+
+    def record_put(self, inserted: bool, probes: int = 0) -> None:
+        """
+        Count one insert or update.
+        """
+        self.puts += 1
+        if inserted:
+            self.inserts += 1
+        if probes:
+            self.put_probes += probes
+            self._record_probes(probes)
+
+    def record_remove(self, removed: bool, probes: int = 0) -> None:
+        """
+        Count one removal, whether or not the key was present.
+        """
+        self.removes += 1
+        if removed:
+            self.removed += 1
+        if probes:
+            self.remove_probes += probes
+            self._record_probes(probes)
+
+    def record_resize(self, seconds: float, count: int = 1) -> None:
+        """
+        Count a resize and the time spent moving entries.
+        """
+        self.resizes += count
+        self.resize_seconds += seconds
+
+    def chain_changed(self, old_length: int, new_length: int) -> None:
+        """
+        Move one chain from old_length to new_length in the chain histogram.
+        A length of -1 adds or drops a chain.
+        """
+        histogram = self.chain_histogram
+        if old_length >= 0:
+            histogram[old_length] -= 1
+        if new_length >= 0:
+            while new_length >= len(histogram):
+                histogram.append(0)
+            histogram[new_length] += 1
+
+    def reset_chains(self, lengths) -> None:
+        """
+        Recount the chain histogram from the length of every chain,
+        after a resize or clear has replaced them all.
+        """
+        self.chain_histogram = [0]
+        for length in lengths:
+            self.chain_changed(-1, length)
+
+    def snapshot(self, size: int, capacity: int, tombstones: int = 0) -> dict:
+        """
+        Return every counter plus the ratios derived from them.
+        """
+        histogram = self.chain_histogram
+        while len(histogram) > 1 and histogram[-1] == 0:
+            histogram.pop()
+
+        return {
+            'size': size,
+            'capacity': capacity,
+            'load': size / capacity,
+            'tombstones': tombstones,
+            'gets': self.gets,
+            'hits': self.hits,
+            'misses': self.gets - self.hits,
+            'hit_ratio': self.hits / self.gets if self.gets else None,
+            'puts': self.puts,
+            'inserts': self.inserts,
+            'removes': self.removes,
+            'removed': self.removed,
+            'mean_get_probes': self.get_probes / self.gets if self.get_probes else None,
+            'mean_put_probes': self.put_probes / self.puts if self.put_probes else None,
+            'mean_remove_probes': self.remove_probes / self.removes if self.remove_probes else None,
+            'max_probes': self.max_probes,
+            'probe_histogram': list(self.probe_histogram),
+            'chain_histogram': list(histogram),
+            'max_chain': len(histogram) - 1,
+            'resizes': self.resizes,
+            'resize_seconds': self.resize_seconds,
+        }
+
+    def operations(self) -> int:
+        """
+        Return the number of gets, puts and removes counted so far.
+        """
+        return self.gets + self.puts + self.removes
+
+    def total_probes(self) -> int:
+        """
+        Return the slots visited by every counted operation.
+        """
+        return self.get_probes + self.put_probes + self.remove_probes
+
+    def key_chain_length(self) -> float:
+        """
+        Return the mean length of the chain each stored key sits in,
+        the number of nodes a lookup of a random stored key walks at most.
+        """
+        keys = 0
+        weighted = 0
+        for length, chains in enumerate(self.chain_histogram):
+            keys += length * chains
+            weighted += length * length * chains
+
+        return weighted / keys if keys else 0.0
+
+    def _record_probes(self, probes: int) -> None:
+        """
+        Add one operation to the probe histogram.
+        """
+        if probes > self.max_probes:
+            self.max_probes = probes
+        self.probe_histogram[min(probes, PROBE_HISTOGRAM_SIZE - 1)] += 1
+
+
+def check_resize_policy(load_factor: float, growth_factor: float, min_load_factor: float,
+                        load_limit: float) -> None:
+    """
+    Raise ValueError unless 0 < min_load_factor < load_factor <= load_limit and growth_factor > 1.
+    """
+    if not 0 < load_factor <= load_limit:
+        raise ValueError("load_factor must be above 0 and at most " + str(load_limit))
+    if growth_factor <= 1:
+        raise ValueError("growth_factor must be above 1")
+    if min_load_factor is not None and not 0 < min_load_factor < load_factor:
+        raise ValueError("min_load_factor must be above 0 and below load_factor")
+
+
+def shrunk_capacity(size: int, load_factor: float, min_load_factor: float) -> int:
+    """
+    Return the capacity a table shrinks to below min_load_factor, the one that puts
+    the load halfway between the thresholds so it does not flip straight back.
+    """
+    return max(1, int(size / ((min_load_factor + load_factor) / 2)))
+
+
+# Operations between two auto-tuning rounds
+TUNE_INTERVAL = 1024
+
+# Growth factor bounds of the auto-tuner
+MIN_GROWTH_FACTOR = 1.5
+MAX_GROWTH_FACTOR = 4.0
+
+
+class LoadTuner:
+    """
+    Auto-tuning of a map created with auto_tune=True, fed from its HashMapStats.
+    Every TUNE_INTERVAL operations the observed probe or chain length is compared
+    with target: slower moves load factor toward floor and grows further per resize,
+    faster moves load factor toward ceiling and grows less. A table whose next growth
+    would pass memory_budget buckets packs up to ceiling instead.
+    """
+    def __init__(self, floor: float, ceiling: float, target: float,
+                 memory_budget: int = None) -> None:
+        """
+        Remember the bounds, the first round is due after TUNE_INTERVAL operations
+        """
+        self.floor = floor
+        self.ceiling = ceiling
+        self.target = target
+        self.memory_budget = memory_budget
+        self.rounds = 0
+
+        # Counters at the last round, the next round compares against them
+        self._operations = 0
+        self._probes = 0
+
+    def due(self, stats: HashMapStats) -> bool:
+        """
+        Return whether TUNE_INTERVAL operations have passed since the last round.
+        """
+        return stats.operations() - self._operations >= TUNE_INTERVAL
+
+    def mean_probes(self, stats: HashMapStats) -> float:
+        """
+        Return the mean slots visited per operation since the last round.
+        """
+        operations = stats.operations() - self._operations
+        return (stats.total_probes() - self._probes) / operations if operations else 0.0
+
+    def tune(self, stats: HashMapStats, observed: float, capacity: int,
+             load_factor: float, growth_factor: float, min_load_factor: float) -> tuple:
+        """
+        Run one round and return the new (load_factor, growth_factor, min_load_factor).
+        min_load_factor keeps its ratio to load_factor.
+        """
+        self._operations = stats.operations()
+        self._probes = stats.total_probes()
+        self.rounds += 1
+
+        new_load_factor = load_factor
+        budget = self.memory_budget
+        if budget is not None and capacity * growth_factor > budget:
+            # Memory bound: fill the buckets we have before growing past the budget
+            new_load_factor = self.ceiling
+            growth_factor = MIN_GROWTH_FACTOR
+        elif observed > self.target * 1.25:
+            # Latency bound: emptier tables, and fewer resizes on the way up
+            new_load_factor = max(self.floor, load_factor * 0.8)
+            growth_factor = min(MAX_GROWTH_FACTOR, growth_factor + 0.5)
+        elif observed < self.target * 0.75:
+            new_load_factor = min(self.ceiling, load_factor * 1.1)
+            growth_factor = max(MIN_GROWTH_FACTOR, growth_factor - 0.5)
+
+        if min_load_factor is not None:
+            min_load_factor = min_load_factor * new_load_factor / load_factor
+
+        return new_load_factor, growth_factor, min_load_factor
@@ -0,0 +1,272 @@
+# Description: Read-only Open Addressing hash table stored in a memory-mapped file.
+# save_table() writes fixed-width slots (hash code, state, offsets) followed by a
+# heap of UTF-8 keys and pickled values. HashMap(path) maps the file and probes
+# it with the same quadratic probing as hash_map_oa, so opening a table does no
+# rehashing and several processes share one copy through the page cache.
+
+import mmap
+import pickle
+import struct
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from hash_map_include import hash_function_name, resolve_hash_function
+
+# Distinct from the hash_map_oa snapshot magic, the two formats are unrelated
+MAGIC = b'HMMP\x00\x00\x00\x01'
+
+# magic, capacity, size, heap offset, heap length, hash function name
+HEADER = struct.Struct('<8sQQQQ32s')
+
+# state, key length, hash code, key offset, value offset, value length
+# Offsets are relative to the start of the heap
+SLOT = struct.Struct('<B3xIQQQQ')
+
+# Slot states, tables written by save_table have no tombstones
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# Hash codes are stored as unsigned 64-bit values
+HASH_MASK = (1 << 64) - 1
+
+
+def save_table(path: str, items, function) -> None:
+    """
+    Write (key, value) pairs to path as a memory-mappable table.
+    Later pairs win for repeated keys. The capacity is the smallest prime
+    that keeps the load factor below 0.5, as in hash_map_oa.
+    """
+    pairs = {}
+    for key, value in items:
+        pairs[key] = value
+
+    capacity = _next_prime(2 * len(pairs) + 1)
+    slots = bytearray(capacity * SLOT.size)
+    heap = bytearray()
+
+    for key, value in pairs.items():
+        key_bytes = key.encode('utf-8')
+        value_bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        hash_code = function(key) & HASH_MASK
+
+        key_offset = len(heap)
+        heap += key_bytes
+        value_offset = len(heap)
+        heap += value_bytes
+
+        # Quadratic probing into the first empty slot
+        index = hash_code % capacity
+        step = 1
+        while slots[index * SLOT.size] != EMPTY:
+            index = (index + step) % capacity
+            step += 2
+
+        SLOT.pack_into(slots, index * SLOT.size, LIVE, len(key_bytes), hash_code,
+                       key_offset, value_offset, len(value_bytes))
+
+    heap_offset = HEADER.size + len(slots)
+    name = hash_function_name(function).encode('ascii')
+
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, capacity, len(pairs), heap_offset, len(heap), name))
+        file.write(slots)
+        file.write(heap)
+
+
+def find_slot(buffer, capacity: int, heap_offset: int, hash_code: int, key_bytes: bytes) -> object:
+    """
+    Probe the slots of a table laid out as HEADER, SLOT * capacity, heap
+    and return the unpacked slot holding key_bytes, or None.
+    """
+    index = hash_code % capacity
+    step = 1
+
+    for _ in range(capacity):
+        slot = SLOT.unpack_from(buffer, HEADER.size + index * SLOT.size)
+
+        # Empty if key does not exist
+        if slot[0] == EMPTY:
+            return None
+
+        # Matching hash code first, then the key bytes, tombstones are passed over
+        if slot[0] == LIVE and slot[2] == hash_code and slot[1] == len(key_bytes):
+            key_start = heap_offset + slot[3]
+            if buffer[key_start:key_start + slot[1]] == key_bytes:
+                return slot
+
+        index = (index + step) % capacity
+        step += 2
+
+    return None
+
+
+def _next_prime(capacity: int) -> int:
+    """
+    Increment from given number to find the closest prime number
+    """
+    if capacity % 2 == 0:
+        capacity += 1
+
+    while not _is_prime(capacity):
+        capacity += 2
+
+    return capacity
+
+
+def _is_prime(capacity: int) -> bool:
+    """
+    Determine if given integer is a prime number and return boolean
+    """
+    if capacity == 2 or capacity == 3:
+        return True
+
+    if capacity == 1 or capacity % 2 == 0:
+        return False
+
+    factor = 3
+    while factor ** 2 <= capacity:
+        if capacity % factor == 0:
+            return False
+        factor += 2
+
+    return True
+
+
+class HashMap:
+    def __init__(self, path: str) -> None:
+        """
+        Open a table written by save_table, read-only and memory-mapped
+        """
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, capacity, size, heap_offset, heap_length, name = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError("not a memory-mapped hash table: " + path)
+
+        self._capacity = capacity
+        self._size = size
+        self._heap_offset = heap_offset
+        self._hash_function = resolve_hash_function(name.rstrip(b'\x00').decode('ascii'))
+
+    def __enter__(self) -> "HashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmap the file
+        """
+        self._map.close()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: str) -> object:
+        """
+        Using quadratic probing, presenting the value from provided key.
+        """
+        slot = find_slot(self._map, self._capacity, self._heap_offset,
+                         self._hash_function(key) & HASH_MASK, key.encode('utf-8'))
+        if slot is None:
+            return None
+
+        return self._load_value(slot)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        True for key in the hash map, False if nothing.
+        A key stored with the value None is still present, and no value is unpickled.
+        """
+        if self._size == 0:
+            return False
+
+        return find_slot(self._map, self._capacity, self._heap_offset,
+                         self._hash_function(key) & HASH_MASK, key.encode('utf-8')) is not None
+
+    def table_load(self) -> float:
+        """
+        Presenting the hash table load factor from calculating.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        The result is how many empty buckets in hash table.
+        """
+        return self._capacity - self._size
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Presenting all key-value pairs as tuple in a dynamic array.
+        """
+        result = DynamicArray()
+        for item in self:
+            result.append((item.key, item.value))
+
+        return result
+
+    def _load_value(self, slot: tuple) -> object:
+        """
+        Unpickle the value of one slot from the heap.
+        """
+        value_start = self._heap_offset + slot[4]
+        return pickle.loads(self._map[value_start:value_start + slot[5]])
+
+    def __iter__(self):
+        """
+        Use only stored item for iterating, as HashEntry objects.
+        """
+        for i in range(self._capacity):
+            slot = SLOT.unpack_from(self._map, HEADER.size + i * SLOT.size)
+            if slot[0] == LIVE:
+                key_start = self._heap_offset + slot[3]
+                key = self._map[key_start:key_start + slot[1]].decode('utf-8')
+                yield HashEntry(key, self._load_value(slot))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    print("\nsave_table / get example 1")
+    print("--------------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'table.hmoa')
+    keys = [i for i in range(1, 1000, 20)]
+    save_table(path, ((str(key), key * 42) for key in keys), hash_function_2)
+
+    with HashMap(path) as m:
+        print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+        result = True
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.get(str(key)) == key * 42
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(result)
+
+    print("\n__iter__ example 1")
+    print("------------------")
+    save_table(path, [(str(i), {'value': i * 24}) for i in range(5)], hash_function_1)
+    with HashMap(path) as m:
+        for item in m:
+            print('K:', item.key, 'V:', item.value)
+    os.remove(path)
@@ -6,26 +6,134 @@
 # Description: The hash table dynamic array uses Open Addressing with Quadratic Probing
 # for resolving the collision. It must be run in average O(1) runtime complexity.
 
+import asyncio
+import time
+
 from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
                         hash_function_1, hash_function_2)
+from hash_map_include import (HashMapStats, LoadTuner, check_capacity_mode, check_resize_policy,
+                              next_power_of_two, next_table_prime, read_snapshot,
+                              shrunk_capacity, write_snapshot)
+
+_SNAPSHOT_MAGIC = b'HMOA\x00\x00\x00\x06'
+
+# Snapshot flags bit of a map saved with stats on, next to the probe strategy index
+_SNAPSHOT_STATS = 0x10
+
+# Accepted probe values, a probe sequence moves by step and then grows step:
+#   'quadratic'  - offsets 1, 4, 9, ... on prime tables, covers half of the slots
+#   'triangular' - offsets 1, 3, 6, ... on power-of-two tables, covers every slot
+#   'linear'     - offsets 1, 2, 3, ..., covers every slot
+#   'double'     - offsets d, 2d, 3d, ... with d from the second hash function, covers every slot
+PROBE_STRATEGIES = ('quadratic', 'triangular', 'linear', 'double')
+
+# Quadratic probing is only sure to find a free slot while at most half of the table is used
+_LOAD_LIMITS = {'quadratic': 0.5, 'triangular': 1.0, 'linear': 1.0, 'double': 1.0}
+
+# Auto-tuning keeps the load factor between _TUNE_FLOOR and the strategy's ceiling,
+# aiming at _TUNE_TARGET slots visited per operation
+_TUNE_FLOOR = 0.25
+_TUNE_CEILINGS = {'quadratic': 0.5, 'triangular': 0.75, 'linear': 0.7, 'double': 0.9}
+_TUNE_TARGET = 2.0
+
+# Longest stretch in seconds resize_async() copies slots before yielding to the
+# event loop, checking the clock every _ASYNC_BATCH slots
+_ASYNC_PAUSE = 0.002
+_ASYNC_BATCH = 64
+
+# aput() starts growing in the background at this share of the load factor,
+# leaving the old table room for the puts made while the new one is built
+_ASYNC_HEADROOM = 0.75
+
+# Default of pop(), tells "no default given" apart from a default of None
+_MISSING = object()
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, capacity_mode: str = 'prime',
+                 stats: bool = False, probe: str = None, load_factor: float = 0.5,
+                 growth_factor: float = 2.0, min_load_factor: float = None,
+                 auto_tune: bool = False, memory_budget: int = None) -> None:
         """
         Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        quadratic probing for collision resolution.
+        capacity_mode picks the capacity schedule, see hash_map_include.
+        Power-of-two tables probe by triangular numbers, which visit every slot.
+        With stats set, operations and probes are counted for get_stats().
+        probe picks another probe sequence, see PROBE_STRATEGIES.
+        The table grows by growth_factor once entries plus tombstones reach
+        load_factor, and shrinks after a remove drops the load below min_load_factor.
+        auto_tune moves all three from the observed probe lengths, packing tighter
+        once growing would pass memory_budget slots.
         """
+        check_capacity_mode(capacity_mode)
+        if probe is None:
+            probe = 'triangular' if capacity_mode == 'power_of_two' else 'quadratic'
+        if probe not in PROBE_STRATEGIES:
+            raise ValueError("probe must be one of " + ", ".join(PROBE_STRATEGIES))
+
+        # Neither sequence reaches every slot on the other kind of table
+        if probe == 'quadratic' and capacity_mode == 'power_of_two':
+            raise ValueError("quadratic probing needs prime capacities")
+        if probe == 'triangular' and capacity_mode != 'power_of_two':
+            raise ValueError("triangular probing needs power-of-two capacities")
+        check_resize_policy(load_factor, growth_factor, min_load_factor, _LOAD_LIMITS[probe])
+
+        self._capacity_mode = capacity_mode
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number, or a power of two in that mode
+        if capacity_mode == 'prime':
+            self._capacity = self._next_prime(capacity)
+        else:
+            self._capacity = self._round_capacity(capacity)
         for _ in range(self._capacity):
             self._buckets.append(None)
 
+        # Probe steps grow by this much per probe: 1, 4, 9, ... or 1, 3, 6, ...
+        # or not at all for linear and double hashing
+        self._probe = probe
+        self._probe_growth = {'quadratic': 2, 'triangular': 1}.get(probe, 0)
+
+        # Double hashing takes the step from the other hash function,
+        # so keys sharing a home slot rarely share the rest of their sequence
+        self._step_function = None
+        if probe == 'double':
+            self._step_function = hash_function_1 if function is hash_function_2 else hash_function_2
+
         self._hash_function = function
         self._size = 0
+        self._tombstones = 0
+
+        # Resize policy, the table never shrinks below its first capacity
+        self._load_factor = load_factor
+        self._growth_factor = growth_factor
+        self._min_load_factor = min_load_factor
+        self._min_capacity = self._capacity
+
+        # Bumped by every change of the set of keys, checked by live iterators
+        self._version = 0
+
+        # Operation and probe counters, None unless requested or auto-tuning
+        self._stats = HashMapStats() if stats or auto_tune else None
+        self._tuner = None
+        if auto_tune:
+            self._tuner = LoadTuner(min(_TUNE_FLOOR, load_factor), _TUNE_CEILINGS[probe],
+                                    _TUNE_TARGET, memory_budget)
+
+        # Slots visited by the last _find_entry
+        self._last_probes = 0
+
+        # Background rebuild state, the new buckets are None when no rebuild runs.
+        # Slots before _resize_index are copied, entries inserted there since
+        # are kept in _resize_log and copied when the rebuild completes.
+        self._resize_buckets = None
+        self._resize_capacity = 0
+        self._resize_index = 0
+        self._resize_log = None
+        self._resize_placed = 0
+        self._resize_seconds = 0.0
+        self._resize_task = None
 
     def __str__(self) -> str:
         """
@@ -84,32 +192,108 @@ class HashMap:
         """
         return self._capacity
 
+    def get_tombstone_count(self) -> int:
+        """
+        Return number of tombstones currently left in the table
+        """
+        return self._tombstones
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
         """
-        Using hash map quadratic probing, refresh the state of key-value pair.
-        If load factor (lambda) is equal to or greater than 0.5, the table is resized
+        Using the map's probe sequence, refresh the state of key-value pair.
+        Once live entries plus tombstones reach the load factor, the table is rebuilt:
+        grown by the growth factor, or compacted in place when tombstones are the majority
         """
-        # Resize is needed or not
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        self._make_room()
 
+        self._insert(key, value, self._hash_function(key))
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Add delta to the value of key, starting from 0 for a new key,
+        and return the new value. The key is hashed and probed once.
+        """
+        self._make_room()
+
+        hash_item = self._insert(key, 0, self._hash_function(key), replace=False)
+        hash_item.value += delta
+        return hash_item.value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Return the value of key, inserting default first if key is missing.
+        """
+        self._make_room()
+
+        return self._insert(key, default, self._hash_function(key), replace=False).value
+
+    def put_many(self, items) -> None:
+        """
+        Insert or update every (key, value) pair of an iterable.
+        The table is sized once up front, so no load check or resize happens per pair.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        # Worst case every pair is a new key
+        self.reserve(self._size + len(pairs))
+
+        hash_function = self._hash_function
+        for key, value in pairs:
+            self._insert(key, value, hash_function(key))
+
+    @classmethod
+    def from_items(cls, items, function, capacity_mode: str = 'prime',
+                   probe: str = None) -> "HashMap":
+        """
+        Build a new hash map from an iterable of (key, value) pairs,
+        allocating the final capacity directly.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        hash_map = cls(2 * len(pairs), function, capacity_mode, probe=probe)
+        hash_map.put_many(pairs)
+        return hash_map
+
+    def reserve(self, count: int) -> None:
+        """
+        Resize the table once so that count entries fit under the load factor.
+        Leftover tombstones are dropped by the same rebuild. The table never shrinks here.
+        """
+        if count > 0 and (count + self._tombstones - 1) / self._capacity >= self._load_factor:
+            self.resize_table(max(int(count / self._load_factor), self._capacity))
+
+    def _insert(self, key: str, value: object, hash_code: int, replace: bool = True) -> HashEntry:
+        """
+        Insert or update a key-value pair without checking the load factor
+        and return its entry. An existing value is kept unless replace is set.
+        """
         # Check the index location at first
-        start_index = self._hash_function(key) % self._capacity
+        capacity = self._capacity
+        index = hash_code % capacity
+        step_code = None if self._step_function is None else self._step_function(key)
+        step = 1 if step_code is None else self._double_step(step_code, capacity)
         first_tomb = None
 
-        # Search the bucket by using quadratic probing
-        for j in range(self._capacity):
-            index = (start_index + j * j) % self._capacity
+        # Search the bucket by following the probe sequence
+        for probes in range(1, capacity + 1):
             hash_item = self._buckets[index]
 
             # Check empty or tombstone for insertion
             if hash_item is None:
-                target = first_tomb if first_tomb is not None else index
-                self._buckets[target] = HashEntry(key, value)
+                if first_tomb is not None:
+                    index = first_tomb
+                    self._tombstones -= 1
+                hash_item = self._new_entry(key, value, hash_code, step_code)
+                self._buckets[index] = hash_item
                 self._size += 1
-                return
+                self._version += 1
+                if self._resize_log is not None and index < self._resize_index:
+                    self._resize_log.append(hash_item)
+                if self._stats is not None:
+                    self._stats.record_put(True, probes)
+                return hash_item
 
             # Check and save the tombstone
             elif hash_item.is_tombstone:
@@ -117,15 +301,28 @@ class HashMap:
                     first_tomb = index
 
             # Refresh
-            elif hash_item.key == key:
-                hash_item.value = value
-                return
+            elif hash_item.hash_code == hash_code and hash_item.key == key:
+                if replace:
+                    hash_item.value = value
+                if self._stats is not None:
+                    self._stats.record_put(False, probes)
+                return hash_item
+
+            index = (index + step) % capacity
+            step += self._probe_growth
 
         # Adding item into first tombstone after retrieve
         if first_tomb is not None:
-            self._buckets[first_tomb] = HashEntry(key, value)
+            hash_item = self._new_entry(key, value, hash_code, step_code)
+            self._buckets[first_tomb] = hash_item
             self._size += 1
-            return
+            self._tombstones -= 1
+            self._version += 1
+            if self._resize_log is not None and first_tomb < self._resize_index:
+                self._resize_log.append(hash_item)
+            if self._stats is not None:
+                self._stats.record_put(True, capacity)
+            return hash_item
 
         # Just in case, what error comes from
         raise Exception("Hash table is full")
@@ -139,25 +336,63 @@ class HashMap:
         if new_capacity < self._size:
             return
 
-        # new_capacity is prime or not
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        new_capacity = self._fit_capacity(new_capacity)
+
+        # A background rebuild is overtaken by this one
+        self._drop_resize()
+        start = time.perf_counter() if self._stats is not None else 0
 
         # Make new and save previous one
         prev_buckets = self._buckets
         self._capacity = new_capacity
-        self._size = 0
+        self._tombstones = 0
+        self._version += 1
 
         # Clear the buckets for new
         self._buckets = DynamicArray()
         for _ in range(self._capacity):
             self._buckets.append(None)
 
-        # Refresh all
+        # Refresh all, the entry is moved by its cached hash code into
+        # the first empty slot since the new table has no tombstones or duplicates
         for i in range(prev_buckets.length()):
             hash_item = prev_buckets[i]
             if hash_item is not None and not hash_item.is_tombstone:
-                self.put(hash_item.key, hash_item.value)
+                self._place_entry(hash_item, self._buckets, self._capacity)
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    async def resize_async(self, new_capacity: int, max_pause: float = _ASYNC_PAUSE) -> None:
+        """
+        Resize like resize_table(), but copy slots into the new table for at most
+        max_pause seconds at a time and yield to the event loop in between. The old
+        table keeps serving reads and writes meanwhile, and the new one replaces it
+        once every entry is copied.
+        """
+        if new_capacity < self._size:
+            return
+
+        self._finish_resize()
+        self._begin_resize(new_capacity)
+        await self._drive_resize(max_pause)
+
+    async def aput(self, key: str, value: object) -> None:
+        """
+        put() for a map shared by asyncio coroutines. Once the table is three
+        quarters of the way to its load factor, a background task builds the grown
+        table chunk by chunk, so no single put rehashes every entry.
+        """
+        if (self._resize_buckets is None
+                and (self._size + self._tombstones + 1) / self._capacity >= self._load_factor * _ASYNC_HEADROOM):
+            self._begin_resize(self._rebuilt_capacity())
+            self._resize_task = asyncio.ensure_future(self._drive_resize(_ASYNC_PAUSE))
+
+        self.put(key, value)
+
+        # Let the rebuild copy a chunk before the caller goes on
+        if self._resize_buckets is not None:
+            await asyncio.sleep(0)
 
     def table_load(self) -> float:
         """
@@ -176,58 +411,116 @@ class HashMap:
 
         return empty_hash
 
-    def get(self, key: str) -> object:
+    def get(self, key: str, default: object = None) -> object:
         """
-        Using quadratic probing, presenting the value from provided key.
+        Using quadratic probing, presenting the value from provided key,
+        or default if nothing.
         """
-        # Checking the index
-        start_index = self._hash_function(key) % self._capacity
+        hash_item = self._find_entry(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.record_get(hash_item is not None, self._last_probes)
 
-        # Using quadratic probing to find
-        for j in range(self._capacity):
-            index = (start_index + j * j) % self._capacity
-            hash_item = self._buckets[index]
+        if hash_item is None:
+            return default
 
-            # Empty if key does not exist
-            if hash_item is None:
-                return None
+        return hash_item.value
 
-            # Matching key-value pair
-            if hash_item.key == key and not hash_item.is_tombstone:
-                return hash_item.value
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Presenting the value of every key of an iterable in a dynamic array,
+        None for missing keys. One pass without a method dispatch per key.
+        """
+        hash_function = self._hash_function
+        find_entry = self._find_entry
+        stats = self._stats
+        result = DynamicArray()
 
-        # Nothing to match
-        return None
+        for key in keys:
+            hash_item = find_entry(key, hash_function(key))
+            if stats is not None:
+                stats.record_get(hash_item is not None, self._last_probes)
+            result.append(None if hash_item is None else hash_item.value)
+
+        return result
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Presenting contains_key of every key of an iterable in a dynamic array.
+        """
+        hash_function = self._hash_function
+        find_entry = self._find_entry
+        stats = self._stats
+        result = DynamicArray()
+
+        for key in keys:
+            hash_item = find_entry(key, hash_function(key))
+            if stats is not None:
+                stats.record_get(hash_item is not None, self._last_probes)
+            result.append(hash_item is not None)
+
+        return result
 
     def contains_key(self, key: str) -> bool:
         """
         True for key in the hash map, False if nothing.
+        A key stored with the value None is still present.
         """
         if self._size == 0:
             return False
 
-        return self.get(key) is not None
+        found = self._find_entry(key, self._hash_function(key)) is not None
+        if self._stats is not None:
+            self._stats.record_get(found, self._last_probes)
+
+        return found
 
     def remove(self, key: str) -> None:
         """
         Target key removed, and then replace the tombstone into it.
         """
         # Using quadratic probing, find the target
-        start_index = self._hash_function(key) % self._capacity
+        hash_item = self._find_entry(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.record_remove(hash_item is not None, self._last_probes)
 
-        for j in range(self._capacity):
-            index = (start_index + j * j) % self._capacity
-            hash_item = self._buckets[index]
+        # No target, empty
+        if hash_item is None:
+            return
 
-            # No target, empty
-            if hash_item is None:
-                return
+        # Deleting the target and replace tombstone
+        hash_item.is_tombstone = True
+        self._size -= 1
+        self._tombstones += 1
+        self._version += 1
 
-            # Deleting the target and replace tombstone
-            if hash_item.key == key and not hash_item.is_tombstone:
-                hash_item.is_tombstone = True
-                self._size -= 1
-                return
+        # Shrinking after mass deletes
+        if self._min_load_factor is not None and self._size < self._min_load_factor * self._capacity:
+            self._shrink()
+
+    def pop(self, key: str, default: object = _MISSING) -> object:
+        """
+        Remove key and return its value. A missing key returns default,
+        or raises KeyError when no default is given.
+        """
+        hash_item = self._find_entry(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.record_remove(hash_item is not None, self._last_probes)
+
+        if hash_item is None:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+
+        # Deleting the target and replace tombstone
+        hash_item.is_tombstone = True
+        self._size -= 1
+        self._tombstones += 1
+        self._version += 1
+
+        # Shrinking after mass deletes
+        if self._min_load_factor is not None and self._size < self._min_load_factor * self._capacity:
+            self._shrink()
+        return hash_item.value
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -248,31 +541,413 @@ class HashMap:
         Empty hash map without any changes.
         """
         self._size = 0
+        self._tombstones = 0
+        self._version += 1
+        self._drop_resize()
 
         for i in range(self._capacity):
             self._buckets[i] = None
 
+    def get_stats(self) -> dict:
+        """
+        Presenting the counters of a map created with stats=True, or None.
+        Reads only the running counters, never the table.
+        """
+        if self._stats is None:
+            return None
+
+        return self._stats.snapshot(self._size, self._capacity, self._tombstones)
+
+    def get_resize_policy(self) -> dict:
+        """
+        Presenting the current load factor, growth factor and shrink threshold,
+        which auto-tuning may have moved since construction.
+        """
+        return {
+            'load_factor': self._load_factor,
+            'growth_factor': self._growth_factor,
+            'min_load_factor': self._min_load_factor,
+            'auto_tune': self._tuner is not None,
+            'tune_rounds': 0 if self._tuner is None else self._tuner.rounds,
+        }
+
+    def _resize_policy_record(self) -> tuple:
+        """
+        Return the resize policy as stored in a snapshot: (load_factor, growth_factor,
+        min_load_factor, auto_tune, memory_budget, min_capacity).
+        """
+        return (self._load_factor, self._growth_factor, self._min_load_factor,
+                self._tuner is not None, None if self._tuner is None else self._tuner.memory_budget,
+                self._min_capacity)
+
+    def save(self, path: str) -> None:
+        """
+        Write a binary snapshot of the table to path. Every entry and tombstone
+        is recorded with its slot index, so load() places it without hashing.
+        """
+        positions, hash_codes, keys, values = [], [], [], []
+        step_codes, tombstones = [], []
+        for i in range(self._capacity):
+            hash_item = self._buckets[i]
+            if hash_item is None:
+                continue
+
+            # Tombstones keep their slots so probe sequences stay unbroken
+            if hash_item.is_tombstone:
+                tombstones.append(i)
+            else:
+                positions.append(i)
+                hash_codes.append(hash_item.hash_code)
+                keys.append(hash_item.key)
+                values.append(hash_item.value)
+                if self._step_function is not None:
+                    step_codes.append(hash_item.step_code)
+
+        # The probe strategy is stored as its index in PROBE_STRATEGIES, plus the stats bit
+        flags = PROBE_STRATEGIES.index(self._probe)
+        if self._stats is not None:
+            flags |= _SNAPSHOT_STATS
+
+        write_snapshot(path, _SNAPSHOT_MAGIC, self._capacity, self._size, self._hash_function,
+                       self._capacity_mode,
+                       self._resize_policy_record(),
+                       (positions, hash_codes, step_codes, tombstones),
+                       keys, values, flags)
+
+    @classmethod
+    def load(cls, path: str) -> "HashMap":
+        """
+        Restore a hash map saved by save(), putting every entry straight back
+        into its recorded slot with the same capacity, hash function, probe strategy
+        and resize policy, auto-tuning and the shrink floor included.
+        Keys and hash codes are read as plain data; the values are unpickled,
+        so only load snapshots from a trusted source. A map saved with stats on
+        comes back with stats on and every counter at zero.
+        """
+        capacity, size, function, capacity_mode, flags, policy, columns, keys, values = read_snapshot(
+            path, _SNAPSHOT_MAGIC)
+        positions, hash_codes, step_codes, tombstones = columns
+        load_factor, growth_factor, min_load_factor, auto_tune, memory_budget, min_capacity = policy
+
+        hash_map = cls(1, function, capacity_mode, stats=bool(flags & _SNAPSHOT_STATS),
+                       probe=PROBE_STRATEGIES[flags & ~_SNAPSHOT_STATS],
+                       load_factor=load_factor, growth_factor=growth_factor,
+                       min_load_factor=min_load_factor, auto_tune=auto_tune,
+                       memory_budget=memory_budget)
+        hash_map._min_capacity = min_capacity
+
+        # Allocate the recorded capacity directly
+        hash_map._capacity = capacity
+        hash_map._buckets = DynamicArray([None] * capacity)
+
+        for i in range(len(keys)):
+            step_code = step_codes[i] if step_codes else None
+            hash_map._buckets[positions[i]] = cls._new_entry(keys[i], values[i], hash_codes[i], step_code)
+
+        for index in tombstones:
+            hash_item = cls._new_entry(None, None, 0)
+            hash_item.is_tombstone = True
+            hash_map._buckets[index] = hash_item
+
+        hash_map._size = size
+        hash_map._tombstones = len(tombstones)
+
+        return hash_map
+
+    def _make_room(self) -> None:
+        """
+        Rebuild the table before an insert once live entries plus tombstones
+        reach the load factor, tombstones still occupy the probe sequences.
+        An auto-tuning round that is due runs first.
+        """
+        if self._tuner is not None and self._tuner.due(self._stats):
+            self._tune()
+
+        if (self._size + self._tombstones) / self._capacity >= self._load_factor:
+            self._rebuild()
+
+    def _tune(self) -> None:
+        """
+        Move the resize policy by one auto-tuning round
+        from the probe lengths seen since the last round.
+        """
+        tuner = self._tuner
+        self._load_factor, self._growth_factor, self._min_load_factor = tuner.tune(
+            self._stats, tuner.mean_probes(self._stats), self._capacity,
+            self._load_factor, self._growth_factor, self._min_load_factor)
+
+    def _shrink(self) -> None:
+        """
+        Rebuild the table smaller, halfway between the shrink threshold and the
+        load factor, unless that would not go below the current capacity.
+        """
+        new_capacity = max(self._min_capacity,
+                           shrunk_capacity(self._size, self._load_factor, self._min_load_factor))
+        if self._round_capacity(new_capacity) < self._capacity:
+            self.resize_table(new_capacity)
+
+    def _rebuild(self) -> None:
+        """
+        Rebuild the table once live entries plus tombstones reach the load factor.
+        Mostly live entries grow the capacity, mostly tombstones are compacted
+        at the same capacity, either way the table is left well under the load factor.
+        """
+        self.resize_table(self._rebuilt_capacity())
+
+    def _rebuilt_capacity(self) -> int:
+        """
+        Return the capacity a rebuild moves to, grown unless tombstones are the majority.
+        """
+        if self._size >= self._tombstones:
+            return self._grown_capacity(self._capacity)
+
+        return self._capacity
+
+    def _begin_resize(self, new_capacity: int) -> None:
+        """
+        Start a background rebuild into an empty table of new_capacity.
+        """
+        new_capacity = self._fit_capacity(new_capacity)
+        self._resize_buckets = DynamicArray([None] * new_capacity)
+        self._resize_capacity = new_capacity
+        self._resize_index = 0
+        self._resize_log = []
+        self._resize_placed = 0
+        self._resize_seconds = 0.0
+
+    def _resize_step(self, count: int) -> None:
+        """
+        Copy the live entries of the next count old slots into the new table,
+        and swap the tables once every slot is copied. The entries are shared,
+        so value updates and removals reach both tables.
+        """
+        start = time.perf_counter()
+        stop = min(self._resize_index + count, self._capacity)
+        for i in range(self._resize_index, stop):
+            hash_item = self._buckets[i]
+            if hash_item is not None and not hash_item.is_tombstone:
+                if not self._copy_entry(hash_item):
+                    return
+        self._resize_index = stop
+        self._resize_seconds += time.perf_counter() - start
+
+        if stop == self._capacity:
+            self._complete_resize()
+
+    def _copy_entry(self, entry: HashEntry) -> bool:
+        """
+        Place entry in the new table and return True. Entries removed after they
+        were copied stay there as tombstones, so puts during the rebuild can crowd
+        the new table: once it reaches the load factor the rebuild is given up
+        for a blocking resize_table() and False is returned.
+        """
+        if self._resize_placed >= self._resize_capacity * self._load_factor:
+            new_capacity = self._resize_capacity
+            self._drop_resize()
+            self.resize_table(new_capacity)
+            return False
+
+        self._place_entry(entry, self._resize_buckets, self._resize_capacity)
+        self._resize_placed += 1
+        return True
+
+    def _complete_resize(self) -> None:
+        """
+        Copy the entries logged during the rebuild and swap in the new table.
+        Entries removed after they were copied are tombstones there.
+        """
+        start = time.perf_counter()
+        for hash_item in self._resize_log:
+            if not hash_item.is_tombstone:
+                if not self._copy_entry(hash_item):
+                    return
+
+        self._buckets = self._resize_buckets
+        self._capacity = self._resize_capacity
+        self._tombstones = self._resize_placed - self._size
+        self._version += 1
+
+        if self._stats is not None:
+            self._stats.record_resize(self._resize_seconds + time.perf_counter() - start)
+        self._drop_resize()
+
+    async def _drive_resize(self, max_pause: float) -> None:
+        """
+        Copy the running rebuild until it is done, yielding every max_pause seconds.
+        """
+        clock = time.perf_counter
+        while self._resize_buckets is not None:
+            deadline = clock() + max_pause
+            self._resize_step(_ASYNC_BATCH)
+            while self._resize_buckets is not None and clock() < deadline:
+                self._resize_step(_ASYNC_BATCH)
+            await asyncio.sleep(0)
+
+    def _finish_resize(self) -> None:
+        """
+        Complete a background rebuild in progress, if any.
+        """
+        while self._resize_buckets is not None:
+            self._resize_step(self._capacity)
+
+    def _drop_resize(self) -> None:
+        """
+        Forget a background rebuild, the old table is still complete.
+        """
+        self._resize_buckets = None
+        self._resize_log = None
+        self._resize_index = 0
+
+    def _find_entry(self, key: str, hash_code: int) -> object:
+        """
+        Following the probe sequence, return the live entry for key, or None.
+        """
+        capacity = self._capacity
+        index = hash_code % capacity
+        step = 1 if self._step_function is None else self._double_step(self._step_function(key), capacity)
+
+        for probes in range(1, capacity + 1):
+            hash_item = self._buckets[index]
+
+            # Empty if key does not exist
+            if hash_item is None:
+                self._last_probes = probes
+                return None
+
+            # Matching key-value pair
+            if (hash_item.hash_code == hash_code and hash_item.key == key
+                    and not hash_item.is_tombstone):
+                self._last_probes = probes
+                return hash_item
+
+            index = (index + step) % capacity
+            step += self._probe_growth
+
+        # Nothing to match
+        self._last_probes = capacity
+        return None
+
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Round capacity up to the next valid capacity of the capacity mode.
+        """
+        if self._capacity_mode == 'power_of_two':
+            return next_power_of_two(capacity)
+
+        if self._capacity_mode == 'prime_table':
+            return next_table_prime(capacity)
+
+        if not self._is_prime(capacity):
+            capacity = self._next_prime(capacity)
+
+        return capacity
+
+    def _fit_capacity(self, new_capacity: int) -> int:
+        """
+        Round a requested capacity up to one that holds every entry under the load factor.
+        """
+        new_capacity = self._round_capacity(new_capacity)
+
+        # Keep growing while the entries would not fit under the load factor
+        while self._size > 0 and (self._size - 1) / new_capacity >= self._load_factor:
+            new_capacity = self._grown_capacity(new_capacity)
+
+        return new_capacity
+
+    def _grown_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity one growth step above capacity, growth_factor times it.
+        The prime table steps at least one entry up, its entries roughly double.
+        """
+        if self._capacity_mode == 'prime_table':
+            return next_table_prime(max(capacity + 1, int(capacity * self._growth_factor / 2)))
+
+        return self._round_capacity(max(capacity + 1, int(capacity * self._growth_factor)))
+
+    def _double_step(self, step_code: int, capacity: int) -> int:
+        """
+        Turn a second hash code into a double hashing step that is coprime
+        with capacity, so the sequence visits every slot.
+        """
+        if self._capacity_mode == 'power_of_two':
+            return (step_code % capacity) | 1
+
+        return 1 + step_code % max(capacity - 1, 1)
+
+    @staticmethod
+    def _new_entry(key: str, value: object, hash_code: int, step_code: int = None) -> HashEntry:
+        """
+        Create a hash entry that caches the full hash code of its key,
+        and the second hash code too under double hashing.
+        """
+        entry = HashEntry(key, value)
+        entry.hash_code = hash_code
+        if step_code is not None:
+            entry.step_code = step_code
+        return entry
+
+    def _place_entry(self, entry: HashEntry, buckets: DynamicArray, capacity: int) -> None:
+        """
+        Put an existing entry into the first empty slot of its probe sequence in buckets.
+        Only used while rebuilding a table, which holds no duplicate keys.
+        """
+        index = entry.hash_code % capacity
+        step = 1 if self._step_function is None else self._double_step(entry.step_code, capacity)
+
+        for _ in range(capacity):
+            if buckets[index] is None:
+                buckets[index] = entry
+                return
+
+            index = (index + step) % capacity
+            step += self._probe_growth
+
+        raise Exception("Hash table is full")
+
+    def keys(self):
+        """
+        Lazily yield every stored key.
+        """
+        for hash_item in self._live_entries():
+            yield hash_item.key
+
+    def values(self):
+        """
+        Lazily yield every stored value.
+        """
+        for hash_item in self._live_entries():
+            yield hash_item.value
+
+    def items(self):
+        """
+        Lazily yield every stored (key, value) pair.
+        """
+        for hash_item in self._live_entries():
+            yield hash_item.key, hash_item.value
+
     def __iter__(self):
         """
-        Use only stored item for iterating.
+        Use only stored item for iterating. Every call returns its own iterator,
+        so several iterations can run over the same map at once.
         """
-        self._iter_index = 0
-        return self
+        return self._live_entries()
 
-    def __next__(self):
+    def _live_entries(self):
         """
-        Search for next slot, if tombstone exists then skip.
+        Yield the live entries slot by slot without copying the table.
+        Raises RuntimeError if a key is added or removed while iterating.
         """
-        while self._iter_index < self._capacity:
-            hash_item = self._buckets[self._iter_index]
-            self._iter_index += 1
+        version = self._version
+
+        for i in range(self._capacity):
+            hash_item = self._buckets[i]
 
             # Presenting only stored items
             if hash_item is not None and not hash_item.is_tombstone:
-                return hash_item
+                yield hash_item
 
-        # End
-        raise StopIteration
+                if self._version != version:
+                    raise RuntimeError("HashMap changed size during iteration")
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -441,6 +1116,45 @@ if __name__ == "__main__":
     m.resize_table(12)
     print(m.get_keys_and_values())
 
+    print("\nput_many / from_items example 1")
+    print("-------------------------------")
+    m = HashMap(11, hash_function_1)
+    m.put_many((str(i), i * 10) for i in range(100))
+    print(m.get_size(), m.get_capacity(), m.get('42'))
+    m = HashMap.from_items([('key' + str(i), i) for i in range(30)], hash_function_2)
+    print(m.get_size(), m.get_capacity(), m.get('key29'))
+
+    print("\ntombstone compaction example 1")
+    print("------------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(1000):
+        m.put('key' + str(i % 20), i)
+        m.remove('key' + str((i + 10) % 20))
+    print(m.get_size(), m.get_tombstone_count(), m.get_capacity())
+
+    print("\ncapacity_mode example 1")
+    print("-----------------------")
+    for mode in ('prime', 'prime_table', 'power_of_two'):
+        m = HashMap(20, hash_function_1, capacity_mode=mode)
+        for i in range(200):
+            m.put('key' + str(i), i)
+        print(mode, m.get_size(), m.get_capacity(), m.get('key199'))
+
+    print("\nsave / load example 1")
+    print("---------------------")
+    import os
+    import tempfile
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    m.remove('3')
+    path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+    m.save(path)
+    restored = HashMap.load(path)
+    print(restored.get_size(), restored.get_capacity(), restored.get('5'), restored.contains_key('3'))
+    print(restored.get_keys_and_values())
+    os.remove(path)
+
     print("\nPDF - clear example 1")
     print("---------------------")
     m = HashMap(101, hash_function_1)
@@ -484,3 +1198,125 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nkeys / values / items example 1")
+    print("-------------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), i * 24)
+    outer = iter(m)
+    first = next(outer)
+    print('K:', first.key, [key for key in m.keys()], sum(m.values()), next(outer).key)
+    print(sorted(m.items()))
+    try:
+        for key in m.keys():
+            m.remove(key)
+    except RuntimeError as error:
+        print(error, m.get_size())
+
+    print("\nincrement / setdefault / pop example 1")
+    print("--------------------------------------")
+    m = HashMap(11, hash_function_1)
+    for word in "the cat and the dog and the bird".split():
+        m.increment(word)
+    m.put('none', None)
+    print(m.get('the'), m.setdefault('cat', 10), m.setdefault('cow', 10), m.get_size())
+    print(m.contains_key('none'), m.get('none', 'default'), m.get('owl', 'default'))
+    print(m.pop('the'), m.pop('owl', 0), m.contains_key('the'), m.get_size())
+    try:
+        m.pop('owl')
+    except KeyError as error:
+        print('KeyError', error)
+
+    print("\nget_stats example 1")
+    print("-------------------")
+    for function in (hash_function_1, hash_function_2):
+        m = HashMap(11, function, stats=True)
+        for i in range(500):
+            m.put('key' + str(i), i)
+        for i in range(0, 1000, 2):
+            m.get('key' + str(i))
+        for i in range(0, 500, 5):
+            m.remove('key' + str(i))
+        stats = m.get_stats()
+        print(function.__name__, stats['size'], stats['capacity'], stats['resizes'],
+              round(stats['mean_put_probes'], 2), round(stats['mean_get_probes'], 2),
+              stats['max_probes'], round(stats['hit_ratio'], 2), stats['tombstones'])
+
+    print("\nprobe strategies example 1")
+    print("--------------------------")
+    for probe, capacity_mode in (('quadratic', 'prime'), ('triangular', 'power_of_two'),
+                                 ('linear', 'prime'), ('double', 'prime')):
+        m = HashMap(11, hash_function_2, capacity_mode, stats=True, probe=probe)
+        for i in range(300):
+            m.put('key' + str(i), i)
+        for i in range(600):
+            m.get('key' + str(i))
+        stats = m.get_stats()
+        print(probe, m.get_size(), m.get_capacity(), m.get('key150'),
+              round(stats['mean_put_probes'], 2), round(stats['mean_get_probes'], 2), stats['max_probes'])
+
+    print("\nresize policy example 1")
+    print("-----------------------")
+    for options in ({}, {'load_factor': 0.75, 'growth_factor': 4, 'min_load_factor': 0.1},
+                    {'auto_tune': True}, {'auto_tune': True, 'memory_budget': 1500}):
+        m = HashMap(11, hash_function_2, probe='double', **options)
+        capacities = []
+        for i in range(2000):
+            m.put('key' + str(i), i)
+        capacities.append(m.get_capacity())
+        for i in range(1990):
+            m.remove('key' + str(i))
+        capacities.append(m.get_capacity())
+        policy = m.get_resize_policy()
+        print(capacities, m.get_size(), m.get('key1995'), round(policy['load_factor'], 2),
+              policy['growth_factor'], policy['tune_rounds'])
+
+    print("\naput / resize_async example 1")
+    print("------------------------------")
+
+    async def fill(hash_map, start, stop):
+        for i in range(start, stop):
+            await hash_map.aput('key' + str(i), i)
+
+    async def resize_while_filling(hash_map):
+        # Two coroutines keep writing while the table grows in the background
+        await asyncio.gather(fill(hash_map, 0, 1000), fill(hash_map, 1000, 2000))
+        capacity = hash_map.get_capacity()
+        await asyncio.gather(hash_map.resize_async(4 * capacity), fill(hash_map, 2000, 2500))
+        return capacity
+
+    m = HashMap(11, hash_function_1)
+    capacity = asyncio.run(resize_while_filling(m))
+    print(m.get_size(), capacity, m.get_capacity(),
+          all(m.get('key' + str(i)) == i for i in range(2500)))
+
+    print("\nsave / load example 2")
+    print("---------------------")
+    m = HashMap(11, hash_function_1, probe='linear', load_factor=0.8, min_load_factor=0.2)
+    for i in range(100):
+        m.put('key' + str(i), i)
+    path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+    m.save(path)
+    restored = HashMap.load(path)
+    # The resize policy survives the round trip
+    print(restored.get_resize_policy() == m.get_resize_policy(), restored.get_resize_policy())
+    restored.put('key100', 100)
+    print(restored.get_capacity() == m.get_capacity(), restored.get('key100'))
+    os.remove(path)
+
+    print("\nsave / load example 3")
+    print("---------------------")
+    m = HashMap(101, hash_function_1, probe='linear', load_factor=0.8, min_load_factor=0.25,
+                auto_tune=True, memory_budget=5000)
+    for i in range(1000):
+        m.put('key' + str(i), i)
+    m.save(path)
+    restored = HashMap.load(path)
+    policy = restored.get_resize_policy()
+    print(policy['auto_tune'], restored._tuner.memory_budget, restored.get_capacity() == m.get_capacity())
+    # Emptied, the restored map shrinks no further than the original first capacity
+    for i in range(1000):
+        restored.remove('key' + str(i))
+    print(restored.get_size(), restored.get_capacity())
+    os.remove(path)
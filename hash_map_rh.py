@@ -0,0 +1,392 @@
+# Description: The hash table dynamic array uses Open Addressing with Robin Hood
+# linear probing. An entry far from its home slot takes the place of an entry closer
+# to its own home, so probe lengths stay even and a lookup can stop early on a miss.
+# Removal shifts the following entries back by one slot, so there are no tombstones.
+# It must be run in average O(1) runtime complexity.
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, load_factor: float = 0.85) -> None:
+        """
+        Initialize new HashMap that uses
+        Robin Hood linear probing for collision resolution
+        """
+        if not 0 < load_factor < 1:
+            raise ValueError("load_factor must be between 0 and 1")
+
+        self._buckets = DynamicArray()
+
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+
+        self._hash_function = function
+        self._load_factor = load_factor
+        self._size = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._buckets.length()):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Insert or update a key-value pair with Robin Hood probing.
+        If the load factor reaches the configured limit, the table is resized.
+        """
+        # Resize is needed or not
+        if self.table_load() >= self._load_factor:
+            self.resize_table(self._capacity * 2)
+
+        self._insert(key, value, self._hash_function(key))
+
+    def put_many(self, items) -> None:
+        """
+        Insert or update every (key, value) pair of an iterable.
+        The table is sized once up front, so no load check or resize happens per pair.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        # Worst case every pair is a new key
+        self.reserve(self._size + len(pairs))
+
+        hash_function = self._hash_function
+        for key, value in pairs:
+            self._insert(key, value, hash_function(key))
+
+    @classmethod
+    def from_items(cls, items, function, load_factor: float = 0.85) -> "HashMap":
+        """
+        Build a new hash map from an iterable of (key, value) pairs,
+        allocating the final capacity directly.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        hash_map = cls(int(len(pairs) / load_factor) + 1, function, load_factor)
+        hash_map.put_many(pairs)
+        return hash_map
+
+    def reserve(self, count: int) -> None:
+        """
+        Resize the table once so that count entries fit under the load factor.
+        The table never shrinks here.
+        """
+        if count > 0 and (count - 1) / self._capacity >= self._load_factor:
+            self.resize_table(int(count / self._load_factor) + 1)
+
+    def _insert(self, key: str, value: object, hash_code: int) -> None:
+        """
+        Insert or update a key-value pair without checking the load factor.
+        """
+        capacity = self._capacity
+        index = hash_code % capacity
+        distance = 0
+
+        # Look for the key until an empty slot or a richer entry shows it is absent
+        while True:
+            hash_item = self._buckets[index]
+            if hash_item is None or (index - hash_item.hash_code) % capacity < distance:
+                break
+
+            # Refresh
+            if hash_item.hash_code == hash_code and hash_item.key == key:
+                hash_item.value = value
+                return
+
+            index = (index + 1) % capacity
+            distance += 1
+
+        self._shift_in(self._new_entry(key, value, hash_code), index, distance)
+        self._size += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Modify the hash table capacity and place every entry again
+        """
+        # Check for using the new capacity correctly
+        if new_capacity < self._size:
+            return
+
+        # new_capacity is prime or not
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        # Keep growing while the entries would not fit under the load factor
+        while self._size > 0 and (self._size - 1) / new_capacity >= self._load_factor:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        # Make new and save previous one
+        prev_buckets = self._buckets
+        self._capacity = new_capacity
+
+        # Clear the buckets for new
+        self._buckets = DynamicArray()
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+
+        # Refresh all from the cached hash codes
+        for i in range(prev_buckets.length()):
+            hash_item = prev_buckets[i]
+            if hash_item is not None:
+                self._shift_in(hash_item, hash_item.hash_code % self._capacity, 0)
+
+    def table_load(self) -> float:
+        """
+        Presenting the hash table load factor from calculating.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        The result is how many empty buckets in hash table.
+        """
+        empty_hash = 0
+        for i in range(self._capacity):
+            if self._buckets[i] is None:
+                empty_hash += 1
+
+        return empty_hash
+
+    def get(self, key: str) -> object:
+        """
+        Presenting the value from provided key, or None if it is absent.
+        """
+        index = self._find_index(key, self._hash_function(key))
+        if index is None:
+            return None
+
+        return self._buckets[index].value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        True for key in the hash map, False if nothing.
+        A key stored with the value None is still present.
+        """
+        if self._size == 0:
+            return False
+
+        return self._find_index(key, self._hash_function(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the target key and shift the rest of its cluster back by one slot.
+        """
+        index = self._find_index(key, self._hash_function(key))
+        if index is None:
+            return
+
+        # Backward shift until an empty slot or an entry already at its home
+        capacity = self._capacity
+        next_index = (index + 1) % capacity
+        while True:
+            next_item = self._buckets[next_index]
+            if next_item is None or (next_index - next_item.hash_code) % capacity == 0:
+                break
+
+            self._buckets[index] = next_item
+            index = next_index
+            next_index = (next_index + 1) % capacity
+
+        self._buckets[index] = None
+        self._size -= 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Presenting all key-value pairs as tuple in a dynamic array.
+        """
+        result = DynamicArray()
+
+        # Retrieve all
+        for i in range(self._capacity):
+            hash_item = self._buckets[i]
+            if hash_item is not None:
+                result.append((hash_item.key, hash_item.value))
+
+        return result
+
+    def clear(self) -> None:
+        """
+        Empty hash map without any changes.
+        """
+        self._size = 0
+
+        for i in range(self._capacity):
+            self._buckets[i] = None
+
+    def _find_index(self, key: str, hash_code: int) -> object:
+        """
+        Return the slot index holding key, or None.
+        The search stops as soon as it passes the distance the key could have reached.
+        """
+        capacity = self._capacity
+        index = hash_code % capacity
+        distance = 0
+
+        while True:
+            hash_item = self._buckets[index]
+
+            # Empty slot or richer entry, key does not exist
+            if hash_item is None or (index - hash_item.hash_code) % capacity < distance:
+                return None
+
+            # Matching key-value pair
+            if hash_item.hash_code == hash_code and hash_item.key == key:
+                return index
+
+            index = (index + 1) % capacity
+            distance += 1
+
+    def _shift_in(self, entry: HashEntry, index: int, distance: int) -> None:
+        """
+        Place entry starting at index, which is distance slots from its home.
+        Whenever a slot holds an entry closer to its home, the two are swapped
+        and the displaced entry continues down the probe sequence.
+        """
+        capacity = self._capacity
+
+        while True:
+            hash_item = self._buckets[index]
+            if hash_item is None:
+                self._buckets[index] = entry
+                return
+
+            item_distance = (index - hash_item.hash_code) % capacity
+            if item_distance < distance:
+                self._buckets[index] = entry
+                entry = hash_item
+                distance = item_distance
+
+            index = (index + 1) % capacity
+            distance += 1
+
+    @staticmethod
+    def _new_entry(key: str, value: object, hash_code: int) -> HashEntry:
+        """
+        Create a hash entry that caches the full hash code of its key.
+        """
+        entry = HashEntry(key, value)
+        entry.hash_code = hash_code
+        return entry
+
+    def __iter__(self):
+        """
+        Use only stored item for iterating.
+        """
+        for i in range(self._capacity):
+            hash_item = self._buckets[i]
+            if hash_item is not None:
+                yield hash_item
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nput example 2")
+    print("-------------")
+    m = HashMap(41, hash_function_2, load_factor=0.95)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nget / remove example 1")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.get(str(key)) == key * 42
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    for key in keys[::2]:
+        m.remove(str(key))
+    for key in keys[1::2]:
+        result &= m.get(str(key)) == key * 42
+    print(result, m.get_size(), m.get_capacity())
+
+    print("\nresize example 1")
+    print("----------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+    m.resize_table(2)
+    print(m.get_keys_and_values(), m.get_capacity())
+
+    print("\niterator example 1")
+    print("------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
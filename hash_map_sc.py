@@ -9,30 +9,116 @@
 # designed for an average runtime complexity of O(1).
 # Bad case must be run in O(N) runtime complexity.
 
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
 
-from a6_include import (DynamicArray, LinkedList,
+from a6_include import (DynamicArray, LinkedList, SLNode,
                         hash_function_1, hash_function_2)
+from hash_map_include import (HashMapStats, LoadTuner, check_capacity_mode, check_resize_policy,
+                              next_power_of_two, next_table_prime, read_snapshot,
+                              shrunk_capacity, write_snapshot)
+
+# Number of old buckets moved into the new table per operation
+# while an incremental resize is in progress
+_MIGRATE_STEP = 4
+
+# Longest stretch in seconds resize_async() moves buckets before yielding to the event loop
+_ASYNC_PAUSE = 0.002
+
+# A chain longer than this becomes a SortedChain, and a SortedChain
+# shorter than _UNTREEIFY_THRESHOLD goes back to a LinkedList
+_TREEIFY_THRESHOLD = 8
+_UNTREEIFY_THRESHOLD = 6
+
+# Inputs shorter than this are not worth starting a process pool for
+_PARALLEL_MIN_ITEMS = 50000
+
+# Auto-tuning keeps the load factor between these bounds, aiming at chains
+# of _TUNE_TARGET nodes on average around each stored key
+_TUNE_FLOOR = 0.5
+_TUNE_CEILING = 3.0
+_TUNE_TARGET = 2.0
+
+_SNAPSHOT_MAGIC = b'HMSC\x00\x00\x00\x04'
+
+# Snapshot flags bits
+_SNAPSHOT_INCREMENTAL = 0x01
+_SNAPSHOT_STATS = 0x02
+
+# Default of pop(), tells "no default given" apart from a default of None
+_MISSING = object()
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 capacity_mode: str = 'prime',
+                 stats: bool = False,
+                 load_factor: float = 1.0,
+                 growth_factor: float = 2.0,
+                 min_load_factor: float = None,
+                 auto_tune: bool = False,
+                 memory_budget: int = None) -> None:
         """
         Initialize new HashMap that uses
-        separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        separate chaining for collision resolution.
+        With incremental set, growth moves a few buckets per operation
+        instead of rehashing the whole table in one call.
+        capacity_mode picks the capacity schedule, see hash_map_include.
+        With stats set, operations are counted for get_stats().
+        The table grows by growth_factor once the load reaches load_factor,
+        and shrinks after a remove drops it below min_load_factor.
+        auto_tune moves all three from the observed chain lengths, packing tighter
+        once growing would pass memory_budget buckets.
         """
+        check_capacity_mode(capacity_mode)
+        check_resize_policy(load_factor, growth_factor, min_load_factor, float('inf'))
+        self._capacity_mode = capacity_mode
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number, or a power of two in that mode
+        if capacity_mode == 'prime':
+            self._capacity = self._next_prime(capacity)
+        else:
+            self._capacity = self._round_capacity(capacity)
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
         self._hash_function = function
         self._size = 0
 
+        # Resize policy, the table never shrinks below its first capacity
+        self._load_factor = load_factor
+        self._growth_factor = growth_factor
+        self._min_load_factor = min_load_factor
+        self._min_capacity = self._capacity
+
+        # Bumped by every change of the set of keys, checked by live iterators
+        self._version = 0
+
+        # Operation counters and chain-length histogram, None unless requested or auto-tuning
+        self._stats = HashMapStats(self._capacity) if stats or auto_tune else None
+        self._tuner = None
+        if auto_tune:
+            self._tuner = LoadTuner(min(_TUNE_FLOOR, load_factor), max(_TUNE_CEILING, load_factor),
+                                    _TUNE_TARGET, memory_budget)
+
+        # Incremental resize state, old buckets are None when no migration runs
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+        self._alloc_index = 0
+        self._alloc_step = 0
+
+        # Task of a resize started by aput(), moving buckets between other coroutines
+        self._resize_task = None
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -95,55 +181,124 @@ class HashMap:
     def put(self, key: str, value: object) -> None:
         """
         Creates a hash map entry by inserting or updating a key-value pair.
-        If load factor (lambda) is equal to or greater than 1, the table is resized.
+        Once the load reaches the map's load factor, the table grows by the growth factor.
         """
-        # Checking if resizing is needed
-        if self.table_load() >= 1.0:
-            self.resize_table(self._capacity * 2)
+        self._make_room()
+        self._insert(key, value, self._hash_function(key))
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value of key, starting from 0 for a new key,
+        and returns the new value. The key is hashed and looked up once.
+        """
+        self._make_room()
+        current_node = self._insert(key, 0, self._hash_function(key), replace=False)
+        current_node.value += delta
+        return current_node.value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value of key, inserting default first if key is missing.
+        """
+        self._make_room()
+        return self._insert(key, default, self._hash_function(key), replace=False).value
 
-        # Finding bucket location
-        index_hash = self._hash_function(key) % self._capacity
-        bucket_hash = self._buckets[index_hash]
+    def put_many(self, items) -> None:
+        """
+        Inserts or updates every (key, value) pair of an iterable.
+        The table is sized once up front, so no load check or resize happens per pair.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        # Worst case every pair is a new key
+        self.reserve(self._size + len(pairs))
+
+        hash_function = self._hash_function
+        for key, value in pairs:
+            self._insert(key, value, hash_function(key))
+
+    @classmethod
+    def from_items(cls, items, function: callable = hash_function_1,
+                   capacity_mode: str = 'prime') -> "HashMap":
+        """
+        Builds a new hash map from an iterable of (key, value) pairs,
+        allocating the final capacity directly.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        hash_map = cls(len(pairs), function, capacity_mode=capacity_mode)
+        hash_map.put_many(pairs)
+        return hash_map
+
+    def reserve(self, count: int) -> None:
+        """
+        Resizes the table once so that count pairs fit without another resize.
+        The table never shrinks here.
+        """
+        if count > self._capacity * self._load_factor:
+            self.resize_table(int(count / self._load_factor))
 
+    def _insert(self, key: str, value: object, hash_code: int, replace: bool = True) -> object:
+        """
+        Inserts or updates a key-value pair without checking the load factor
+        and returns its node. An existing value is kept unless replace is set.
+        """
         # Checking if key already exists
-        current_node = bucket_hash.contains(key)
+        current_node = self._lookup(key, hash_code)
         if current_node:
-            current_node.value = value
-            return
+            if replace:
+                current_node.value = value
+            if self._stats is not None:
+                self._stats.record_put(False)
+            return current_node
 
         # key not found, add new key-value pair
-        bucket_hash.insert(key, value)
+        index = hash_code % self._capacity
+        self._chain(index)
+        current_node = self._insert_node(self._buckets, index, key, value, hash_code)
         self._size += 1
+        self._version += 1
 
+        if self._stats is not None:
+            length = self._buckets[index].length()
+            self._stats.record_put(True)
+            self._stats.chain_changed(length - 1, length)
+        return current_node
 
     def resize_table(self, new_capacity: int) -> None:
         """
-        Resizes the hash table to new capacity and rehashes all existing key-value pairs
-        with prime number.
+        Resizes the hash table to new capacity and rehashes all existing key-value pairs.
+        The capacity is rounded up to a prime, or a power of two in that mode.
         """
         # Create new_capacity or not
         if new_capacity < 1:
             return
 
-        # Make sure the prime number in new_capacity
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        self._finish_migration()
+        new_capacity = self._fit_capacity(new_capacity)
+        start = time.perf_counter() if self._stats is not None else 0
 
         # Save previous bucket for new
         prev_buckets = self._buckets
         self._capacity = new_capacity
-        self._size = 0
+        self._version += 1
 
         # Empty for new buckets
         self._buckets = DynamicArray()
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
-        # Existing pair must be rehashed
+        # Existing pair is placed again from its cached hash code,
+        # keys are unique so no lookup or load check is needed
         for i in range(prev_buckets.length()):
             current_node = prev_buckets[i]
             for node in current_node:
-                self.put(node.key, node.value)
+                self._insert_node(self._buckets, node.hash_code % self._capacity,
+                                  node.key, node.value, node.hash_code)
+
+        if self._stats is not None:
+            self._stats.reset_chains(self._buckets[i].length() for i in range(self._capacity))
+            self._stats.record_resize(time.perf_counter() - start)
 
     def table_load(self) -> float:
         """
@@ -155,6 +310,8 @@ class HashMap:
         """
         Check the number of hash table empty buckets.
         """
+        self._finish_migration()
+
         empty_hash = 0
         for i in range(self._capacity):
             if self._buckets[i].length() == 0:
@@ -162,49 +319,118 @@ class HashMap:
 
         return empty_hash
 
-    def get(self, key: str) -> object:
+    def get(self, key: str, default: object = None) -> object:
         """
-        Showing the key-value pair or nothing if no match.
+        Showing the value of key, or default if no match.
         """
-        # Searching for the target location
-        index_hash = self._hash_function(key) % self._capacity
-        bucket_hash = self._buckets[index_hash]
+        if self._old_buckets is not None:
+            self._migrate_step()
 
         # Checking the key location
-        current_node = bucket_hash.contains(key)
+        current_node = self._lookup(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.record_get(current_node is not None)
+
         if current_node:
             return current_node.value
 
         # Nothing matches
-        return None
+        return default
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Showing the value of every key of an iterable in a dynamic array,
+        None for missing keys. One pass without a method dispatch per key.
+        """
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        hash_function = self._hash_function
+        lookup = self._lookup
+        stats = self._stats
+        result = DynamicArray()
+
+        for key in keys:
+            current_node = lookup(key, hash_function(key))
+            if stats is not None:
+                stats.record_get(current_node is not None)
+            result.append(current_node.value if current_node else None)
+
+        return result
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Showing contains_key of every key of an iterable in a dynamic array.
+        """
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        hash_function = self._hash_function
+        lookup = self._lookup
+        stats = self._stats
+        result = DynamicArray()
+
+        for key in keys:
+            current_node = lookup(key, hash_function(key))
+            if stats is not None:
+                stats.record_get(current_node is not None)
+            result.append(current_node is not None)
+
+        return result
 
     def contains_key(self, key: str) -> bool:
         """
         True for key in the hash map, False nothing matches.
+        A key stored with the value None is still present.
         """
         if self._size == 0:
             return False
 
+        if self._old_buckets is not None:
+            self._migrate_step()
+
         # Checking key existence
-        return self.get(key) is not None
+        found = self._lookup(key, self._hash_function(key)) is not None
+        if self._stats is not None:
+            self._stats.record_get(found)
+
+        return found
 
     def remove(self, key: str) -> None:
         """
         Hash map removes the target key-value pair.
         If the key is not present, do nothing.
         """
-        # Checking the target location
-        index_hash = self._hash_function(key) % self._capacity
-        bucket_hash = self._buckets[index_hash]
+        if self._old_buckets is not None:
+            self._migrate_step()
 
-        # Checking the key location
-        if bucket_hash.remove(key):
-            self._size -= 1
+        if self._remove_node(key, self._hash_function(key)) is not None:
+            self._shrink_if_sparse()
+
+    def pop(self, key: str, default: object = _MISSING) -> object:
+        """
+        Removes key and returns its value. A missing key returns default,
+        or raises KeyError when no default is given.
+        """
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        current_node = self._remove_node(key, self._hash_function(key))
+        if current_node is not None:
+            self._shrink_if_sparse()
+            return current_node.value
+
+        if default is _MISSING:
+            raise KeyError(key)
+
+        return default
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Presenting current key-value pairs as a tuple to a dynamic array.
         """
+        self._finish_migration()
+
         result = DynamicArray()
 
         # Retrieve all
@@ -215,17 +441,553 @@ class HashMap:
 
         return result
 
+    def keys(self):
+        """
+        Lazily yield every stored key.
+        """
+        for node in self:
+            yield node.key
+
+    def values(self):
+        """
+        Lazily yield every stored value.
+        """
+        for node in self:
+            yield node.value
+
+    def items(self):
+        """
+        Lazily yield every stored (key, value) pair.
+        """
+        for node in self:
+            yield node.key, node.value
+
+    def __iter__(self):
+        """
+        Walk the chains node by node without copying the table. Every call
+        returns its own iterator, so several iterations can run at once.
+        Raises RuntimeError if a key is added or removed while iterating.
+        """
+        self._finish_migration()
+        version = self._version
+
+        for i in range(self._capacity):
+            for node in self._buckets[i]:
+                yield node
+
+                if self._version != version:
+                    raise RuntimeError("HashMap changed size during iteration")
+
     def clear(self) -> None:
         """
         Empty hash map with same capacity.
         """
         # Initialize the table size
         self._size = 0
+        self._old_buckets = None
+        self._version += 1
 
         # Empty all
         for i in range(self._capacity):
             self._buckets[i] = LinkedList()
 
+        if self._stats is not None:
+            self._stats.reset_chains(0 for _ in range(self._capacity))
+
+    def get_stats(self) -> dict:
+        """
+        Presenting the counters of a map created with stats=True, or None.
+        Reads only the running counters, never the table.
+        """
+        if self._stats is None:
+            return None
+
+        return self._stats.snapshot(self._size, self._capacity)
+
+    def get_resize_policy(self) -> dict:
+        """
+        Presenting the current load factor, growth factor and shrink threshold,
+        which auto-tuning may have moved since construction.
+        """
+        return {
+            'load_factor': self._load_factor,
+            'growth_factor': self._growth_factor,
+            'min_load_factor': self._min_load_factor,
+            'auto_tune': self._tuner is not None,
+            'tune_rounds': 0 if self._tuner is None else self._tuner.rounds,
+        }
+
+    def _resize_policy_record(self) -> tuple:
+        """
+        Return the resize policy as stored in a snapshot: (load_factor, growth_factor,
+        min_load_factor, auto_tune, memory_budget, min_capacity).
+        """
+        return (self._load_factor, self._growth_factor, self._min_load_factor,
+                self._tuner is not None, None if self._tuner is None else self._tuner.memory_budget,
+                self._min_capacity)
+
+    def save(self, path: str) -> None:
+        """
+        Writes a binary snapshot of the table to path. Every pair is recorded with
+        its bucket index and cached hash code, so load() places it without hashing.
+        """
+        self._finish_migration()
+
+        positions, hash_codes, keys, values = [], [], [], []
+        for i in range(self._capacity):
+            for node in self._buckets[i]:
+                positions.append(i)
+                hash_codes.append(node.hash_code)
+                keys.append(node.key)
+                values.append(node.value)
+
+        write_snapshot(path, _SNAPSHOT_MAGIC, self._capacity, self._size, self._hash_function,
+                       self._capacity_mode,
+                       self._resize_policy_record(),
+                       (positions, hash_codes), keys, values,
+                       (_SNAPSHOT_INCREMENTAL if self._incremental else 0)
+                       | (_SNAPSHOT_STATS if self._stats is not None else 0))
+
+    @classmethod
+    def load(cls, path: str) -> "HashMap":
+        """
+        Restores a hash map saved by save(), putting every pair straight back
+        into its recorded bucket with the same capacity, hash function and resize policy,
+        auto-tuning and the shrink floor included.
+        Keys and hash codes are read as plain data; the values are unpickled,
+        so only load snapshots from a trusted source. A map saved with stats on
+        comes back with stats on and every counter at zero.
+        """
+        capacity, size, function, capacity_mode, flags, policy, columns, keys, values = read_snapshot(
+            path, _SNAPSHOT_MAGIC)
+        positions, hash_codes = columns
+        load_factor, growth_factor, min_load_factor, auto_tune, memory_budget, min_capacity = policy
+
+        hash_map = cls(1, function, incremental=bool(flags & _SNAPSHOT_INCREMENTAL),
+                       capacity_mode=capacity_mode, stats=bool(flags & _SNAPSHOT_STATS),
+                       load_factor=load_factor, growth_factor=growth_factor,
+                       min_load_factor=min_load_factor, auto_tune=auto_tune,
+                       memory_budget=memory_budget)
+        hash_map._min_capacity = min_capacity
+
+        # Allocate the recorded capacity directly
+        hash_map._capacity = capacity
+        hash_map._buckets = DynamicArray()
+        for _ in range(capacity):
+            hash_map._buckets.append(LinkedList())
+
+        # Chains are rebuilt back to front since insert places nodes at the head
+        for i in range(len(keys) - 1, -1, -1):
+            hash_map._insert_node(hash_map._buckets, positions[i], keys[i], values[i], hash_codes[i])
+        hash_map._size = size
+
+        # The chain histogram of auto-tuning was built for the placeholder capacity
+        if hash_map._stats is not None:
+            hash_map._stats.reset_chains(hash_map._buckets[i].length() for i in range(capacity))
+
+        return hash_map
+
+    def _fit_capacity(self, new_capacity: int) -> int:
+        """
+        Round a requested capacity up to one that holds every pair under the load factor.
+        """
+        new_capacity = self._round_capacity(new_capacity)
+
+        # Keep growing while the pairs would not fit under the load factor
+        while self._size > new_capacity * self._load_factor:
+            new_capacity = self._grown_capacity(new_capacity)
+
+        return new_capacity
+
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Round capacity up to the next valid capacity of the capacity mode.
+        """
+        if self._capacity_mode == 'power_of_two':
+            return next_power_of_two(capacity)
+
+        if self._capacity_mode == 'prime_table':
+            return next_table_prime(capacity)
+
+        # Make sure the prime number in capacity
+        if not self._is_prime(capacity):
+            capacity = self._next_prime(capacity)
+
+        return capacity
+
+    def _grown_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity one growth step above capacity, growth_factor times it.
+        The prime table steps at least one entry up, its entries roughly double.
+        """
+        if self._capacity_mode == 'prime_table':
+            return next_table_prime(max(capacity + 1, int(capacity * self._growth_factor / 2)))
+
+        return self._round_capacity(max(capacity + 1, int(capacity * self._growth_factor)))
+
+    def _begin_migration(self, new_capacity: int) -> None:
+        """
+        Start an incremental resize. The new buckets start out unallocated and
+        both the chains and the old pairs are moved over a few at a time
+        by later operations.
+        """
+        self._finish_migration()
+        new_capacity = self._fit_capacity(new_capacity)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+
+        # Allocate enough new chains per old bucket to finish with the last one
+        self._alloc_index = 0
+        self._alloc_step = -(-new_capacity // self._old_capacity)
+
+        self._capacity = new_capacity
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._version += 1
+
+        # The unallocated new chains count as empty until they are filled
+        if self._stats is not None:
+            self._stats.record_resize(0.0)
+            self._stats.chain_histogram[0] += new_capacity
+
+    def _migrate_step(self, count: int = _MIGRATE_STEP) -> None:
+        """
+        Move the next count old buckets into the new table.
+        """
+        stats = self._stats
+        start = time.perf_counter() if stats is not None else 0
+
+        # Allocate a share of the new chains
+        stop = min(self._alloc_index + count * self._alloc_step, self._capacity)
+        for i in range(self._alloc_index, stop):
+            self._chain(i)
+        self._alloc_index = stop
+
+        # Move a share of the old chains from their cached hash codes
+        stop = min(self._migrate_index + count, self._old_capacity)
+        for i in range(self._migrate_index, stop):
+            for node in self._old_buckets[i]:
+                index = node.hash_code % self._capacity
+                self._chain(index)
+                self._insert_node(self._buckets, index, node.key, node.value, node.hash_code)
+                if stats is not None:
+                    length = self._buckets[index].length()
+                    stats.chain_changed(length - 1, length)
+            if stats is not None:
+                stats.chain_changed(self._old_buckets[i].length(), -1)
+            self._old_buckets[i] = None
+        self._migrate_index = stop
+
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start, count=0)
+
+        if self._migrate_index == self._old_capacity:
+            self._old_buckets = None
+
+    async def resize_async(self, new_capacity: int, max_pause: float = _ASYNC_PAUSE) -> None:
+        """
+        Resize like resize_table(), but move old buckets for at most max_pause
+        seconds at a time and yield to the event loop in between. Reads and writes
+        from other coroutines stay correct meanwhile, they search the buckets
+        not yet moved as well.
+        """
+        if new_capacity < 1:
+            return
+
+        self._begin_migration(new_capacity)
+        await self._drive_migration(max_pause)
+
+    async def aput(self, key: str, value: object) -> None:
+        """
+        put() for a map shared by asyncio coroutines. A put that needs the table
+        to grow starts a migration that a background task moves chunk by chunk,
+        in short pauses instead of rehashing every pair before returning.
+        """
+        if self._old_buckets is None and self.table_load() >= self._load_factor:
+            self._begin_migration(self._grown_capacity(self._capacity))
+            self._resize_task = asyncio.ensure_future(self._drive_migration(_ASYNC_PAUSE))
+
+        self.put(key, value)
+
+        # Let the migration move a chunk before the caller goes on
+        if self._old_buckets is not None:
+            await asyncio.sleep(0)
+
+    async def _drive_migration(self, max_pause: float) -> None:
+        """
+        Move the running migration until it is done, yielding every max_pause seconds.
+        Operations of other coroutines move buckets too, or finish the migration
+        outright when they need the whole table.
+        """
+        clock = time.perf_counter
+        while self._old_buckets is not None:
+            deadline = clock() + max_pause
+            self._migrate_step()
+            while self._old_buckets is not None and clock() < deadline:
+                self._migrate_step()
+            await asyncio.sleep(0)
+
+    def _finish_migration(self) -> None:
+        """
+        Complete an incremental resize in progress, if any.
+        """
+        while self._old_buckets is not None:
+            self._migrate_step()
+
+    def _make_room(self) -> None:
+        """
+        Advance a running migration and grow the table before an insert
+        if load factor (lambda) is equal to or greater than the configured one.
+        An auto-tuning round that is due runs first.
+        """
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        if self._tuner is not None and self._tuner.due(self._stats):
+            tuner = self._tuner
+            self._load_factor, self._growth_factor, self._min_load_factor = tuner.tune(
+                self._stats, self._stats.key_chain_length(), self._capacity,
+                self._load_factor, self._growth_factor, self._min_load_factor)
+
+        # Checking if resizing is needed
+        if self.table_load() >= self._load_factor:
+            self._move_to(self._grown_capacity(self._capacity))
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Shrink the table after a remove once the load falls below min_load_factor,
+        to halfway between the shrink threshold and the load factor.
+        """
+        if self._min_load_factor is None or self._size >= self._min_load_factor * self._capacity:
+            return
+
+        new_capacity = max(self._min_capacity,
+                           shrunk_capacity(self._size, self._load_factor, self._min_load_factor))
+        if self._round_capacity(new_capacity) < self._capacity:
+            self._move_to(new_capacity)
+
+    def _move_to(self, new_capacity: int) -> None:
+        """
+        Resize to new_capacity, incrementally when the map was created that way.
+        """
+        if self._incremental:
+            self._begin_migration(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+    def _remove_node(self, key: str, hash_code: int) -> object:
+        """
+        Unlink the node holding key and return it, or None if the key is missing.
+        """
+        # Checking the target location
+        buckets = self._buckets
+        index = hash_code % self._capacity
+        current_node = self._find_node(buckets[index], key, hash_code)
+
+        # The key may still sit in a bucket the migration has not reached
+        if current_node is None and self._old_buckets is not None:
+            old_index = hash_code % self._old_capacity
+            if old_index >= self._migrate_index:
+                buckets = self._old_buckets
+                index = old_index
+                current_node = self._find_node(buckets[index], key, hash_code)
+
+        if self._stats is not None:
+            self._stats.record_remove(current_node is not None)
+
+        if current_node is None:
+            return None
+
+        bucket_hash = buckets[index]
+        if type(bucket_hash) is SortedChain:
+            bucket_hash.remove_node(key, hash_code)
+
+            # Back to a plain chain once it is short again
+            if bucket_hash.length() < _UNTREEIFY_THRESHOLD:
+                buckets[index] = bucket_hash.to_linked_list()
+        else:
+            bucket_hash.remove(key)
+        self._size -= 1
+        self._version += 1
+
+        if self._stats is not None:
+            length = buckets[index].length()
+            self._stats.chain_changed(length + 1, length)
+        return current_node
+
+    def _lookup(self, key: str, hash_code: int) -> object:
+        """
+        Return the node holding key, or None.
+        During a migration, old buckets not yet moved are searched as well.
+        """
+        current_node = self._find_node(self._buckets[hash_code % self._capacity], key, hash_code)
+
+        if current_node is None and self._old_buckets is not None:
+            old_index = hash_code % self._old_capacity
+            if old_index >= self._migrate_index:
+                current_node = self._find_node(self._old_buckets[old_index], key, hash_code)
+
+        return current_node
+
+    def _chain(self, index: int) -> LinkedList:
+        """
+        Return the chain at index, allocating it if a migration has not done so yet.
+        """
+        bucket_hash = self._buckets[index]
+        if bucket_hash is None:
+            bucket_hash = LinkedList()
+            self._buckets[index] = bucket_hash
+
+        return bucket_hash
+
+    @staticmethod
+    def _find_node(bucket: LinkedList, key: str, hash_code: int) -> object:
+        """
+        Walk one chain and return the node holding key, or None.
+        The cached hash code is compared first so most string comparisons are skipped.
+        A SortedChain is binary searched instead.
+        """
+        if bucket is None:
+            return None
+
+        if type(bucket) is SortedChain:
+            return bucket.find(key, hash_code)
+
+        for node in bucket:
+            if node.hash_code == hash_code and node.key == key:
+                return node
+
+        return None
+
+    @staticmethod
+    def _insert_node(buckets: DynamicArray, index: int, key: str, value: object, hash_code: int) -> object:
+        """
+        Insert a new node into the chain at index, cache the full hash code on it and return it.
+        A chain that grows past _TREEIFY_THRESHOLD is replaced by a SortedChain.
+        """
+        bucket = buckets[index]
+        if type(bucket) is SortedChain:
+            return bucket.insert_node(key, value, hash_code)
+
+        bucket.insert(key, value)
+
+        # LinkedList.insert places the new node at the head of the chain
+        current_node = next(iter(bucket))
+        current_node.hash_code = hash_code
+
+        if bucket.length() > _TREEIFY_THRESHOLD:
+            buckets[index] = SortedChain(bucket)
+        return current_node
+
+
+class SortedChain:
+    """
+    Bucket of a chain that grew past _TREEIFY_THRESHOLD. Nodes stay linked in
+    the same order as the LinkedList they came from, so iteration and printing
+    are unchanged, and are also kept sorted by (hash code, key) so a lookup is
+    a binary search instead of a walk over every colliding key.
+    """
+    def __init__(self, chain: LinkedList) -> None:
+        """
+        Take over the nodes of chain, keeping their order
+        """
+        nodes = list(chain)
+
+        self._head = None
+        for node in reversed(nodes):
+            self._link(node)
+
+        nodes.sort(key=lambda node: (node.hash_code, node.key))
+        self._order = [(node.hash_code, node.key) for node in nodes]
+        self._nodes = nodes
+
+    def __str__(self) -> str:
+        """
+        Print the same way as the LinkedList it replaced
+        """
+        return str(self.to_linked_list())
+
+    def __iter__(self):
+        """
+        Walk the nodes in chain order, most recently inserted first
+        """
+        node = self._head
+        while node is not None:
+            yield node
+            node = node.next
+
+    def length(self) -> int:
+        """
+        Return number of nodes
+        """
+        return len(self._nodes)
+
+    def find(self, key: str, hash_code: int) -> object:
+        """
+        Return the node holding key, or None.
+        """
+        position = bisect_left(self._order, (hash_code, key))
+        if position < len(self._order) and self._order[position] == (hash_code, key):
+            return self._nodes[position]
+
+        return None
+
+    def insert_node(self, key: str, value: object, hash_code: int) -> SLNode:
+        """
+        Add a new key at the head of the chain and return its node.
+        """
+        node = SLNode(key, value)
+        node.hash_code = hash_code
+        self._link(node)
+
+        position = bisect_left(self._order, (hash_code, key))
+        self._order.insert(position, (hash_code, key))
+        self._nodes.insert(position, node)
+        return node
+
+    def remove_node(self, key: str, hash_code: int) -> object:
+        """
+        Unlink the node holding key and return it, or None.
+        """
+        position = bisect_left(self._order, (hash_code, key))
+        if position == len(self._order) or self._order[position] != (hash_code, key):
+            return None
+
+        del self._order[position]
+        node = self._nodes.pop(position)
+
+        # Unlink from both neighbours
+        if node.prev is None:
+            self._head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is not None:
+            node.next.prev = node.prev
+
+        return node
+
+    def to_linked_list(self) -> LinkedList:
+        """
+        Return a LinkedList holding the same pairs in the same order.
+        """
+        chain = LinkedList()
+        for node in reversed(list(self)):
+            chain.insert(node.key, node.value)
+            next(iter(chain)).hash_code = node.hash_code
+
+        return chain
+
+    def _link(self, node: SLNode) -> None:
+        """
+        Put node at the head of the chain order.
+        """
+        node.next = self._head
+        node.prev = None
+        if self._head is not None:
+            self._head.prev = node
+        self._head = node
+
 
 def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     """
@@ -239,12 +1001,7 @@ def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
 
     # Checking the individual frequency
     for i in range(da.length()):
-        each_element = da[i]
-        current_number = map.get(each_element)
-        if current_number is None:
-            map.put(each_element, 1)
-        else:
-            map.put(each_element, current_number + 1)
+        map.increment(da[i])
 
     # Checking the highest frequency
     max_frequency = 0
@@ -264,10 +1021,98 @@ def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     return result, max_frequency
 
 
+def find_mode_parallel(da: DynamicArray, workers: int = None) -> tuple[DynamicArray, int]:
+    """
+    Same result as find_mode, computed across a process pool.
+    Round one: every worker counts one slice of the input into its own HashMap and
+    splits the counts into one partition per worker by hash of the key.
+    Round two: every worker merges one partition from all slices and finds its local mode,
+    so no key is counted in two places and the partial modes combine directly.
+    The order of keys in the result may differ from find_mode.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Small inputs or a single worker run sequentially
+    if workers < 2 or da.length() < _PARALLEL_MIN_ITEMS:
+        return find_mode(da)
+
+    items = [da[i] for i in range(da.length())]
+    chunk = -(-len(items) // workers)
+    slices = [items[i:i + chunk] for i in range(0, len(items), chunk)]
+
+    with ProcessPoolExecutor(workers) as pool:
+        partials = list(pool.map(_count_slice, slices, [workers] * len(slices)))
+        partitions = [[partial[p] for partial in partials] for p in range(workers)]
+        local_modes = list(pool.map(_merge_partition, partitions))
+
+    # Checking the highest frequency
+    max_frequency = 0
+    for keys, frequency in local_modes:
+        if frequency > max_frequency:
+            max_frequency = frequency
+
+    # Get the all highest frequency
+    result = DynamicArray()
+    for keys, frequency in local_modes:
+        if frequency == max_frequency:
+            for key in keys:
+                result.append(key)
+
+    return result, max_frequency
+
+
+def _count_slice(items: list, partitions: int) -> list:
+    """
+    Count one slice of the input and split the (key, count) pairs into
+    partitions by hash of the key. Runs in a worker process.
+    """
+    counts = HashMap()
+    for each_element in items:
+        counts.increment(each_element)
+
+    result = [[] for _ in range(partitions)]
+    tuples = counts.get_keys_and_values()
+    for i in range(tuples.length()):
+        key, value = tuples[i]
+        result[hash_function_1(key) % partitions].append((key, value))
+
+    return result
+
+
+def _merge_partition(parts: list) -> tuple[list, int]:
+    """
+    Merge one partition of counts from every slice and return its
+    most frequent keys with their frequency. Runs in a worker process.
+    """
+    counts = HashMap()
+    for part in parts:
+        for key, value in part:
+            counts.increment(key, value)
+
+    # Checking the highest frequency
+    max_frequency = 0
+    tuples = counts.get_keys_and_values()
+    for i in range(tuples.length()):
+        key, value = tuples[i]
+        if value > max_frequency:
+            max_frequency = value
+
+    # Get the all highest frequency
+    keys = []
+    for i in range(tuples.length()):
+        key, value = tuples[i]
+        if value == max_frequency:
+            keys.append(key)
+
+    return keys, max_frequency
+
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 
 if __name__ == "__main__":
+    from itertools import permutations
 
     print("\nPDF - put example 1")
     print("-------------------")
@@ -423,6 +1268,46 @@ if __name__ == "__main__":
     m.resize_table(2)
     print(m.get_keys_and_values())
 
+    print("\nput_many / from_items example 1")
+    print("-------------------------------")
+    m = HashMap(11, hash_function_1)
+    m.put_many((str(i), i * 10) for i in range(100))
+    print(m.get_size(), m.get_capacity(), m.get('42'))
+    m = HashMap.from_items([('key' + str(i), i) for i in range(30)], hash_function_2)
+    print(m.get_size(), m.get_capacity(), m.get('key29'))
+
+    print("\nincremental resize example 1")
+    print("----------------------------")
+    m = HashMap(11, hash_function_1, incremental=True)
+    for i in range(100):
+        m.put('key' + str(i), i)
+        if i % 20 == 19:
+            print(m.get_size(), m.get_capacity(), m.get('key0'), m.get('key' + str(i)))
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\ncapacity_mode example 1")
+    print("-----------------------")
+    for mode in ('prime', 'prime_table', 'power_of_two'):
+        m = HashMap(20, hash_function_1, capacity_mode=mode)
+        for i in range(200):
+            m.put('key' + str(i), i)
+        print(mode, m.get_size(), m.get_capacity(), m.get('key199'))
+
+    print("\nsave / load example 1")
+    print("---------------------")
+    import os
+    import tempfile
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    m.remove('3')
+    path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+    m.save(path)
+    restored = HashMap.load(path)
+    print(restored.get_size(), restored.get_capacity(), restored.get('5'), restored.contains_key('3'))
+    print(restored.get_keys_and_values())
+    os.remove(path)
+
     print("\nPDF - clear example 1")
     print("---------------------")
     m = HashMap(101, hash_function_1)
@@ -465,3 +1350,130 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nfind_mode_parallel example 1")
+    print("----------------------------")
+    words = ["apple", "grape", "melon", "peach", "lemon", "mango", "berry"]
+    da = DynamicArray([words[(i * i) % 7] + str(i % 50) for i in range(200000)])
+    mode, frequency = find_mode_parallel(da, workers=4)
+    expected_mode, expected_frequency = find_mode(da)
+    print(sorted(mode), frequency)
+    print(sorted(mode) == sorted(expected_mode), frequency == expected_frequency)
+
+    print("\nkeys / values / items example 1")
+    print("-------------------------------")
+    m = HashMap(7, hash_function_1, incremental=True)
+    for i in range(10):
+        m.put('key' + str(i), i)
+    print(sorted(m.keys()), sum(m.values()), len(list(m.items())))
+    try:
+        for key, value in m.items():
+            m.put(key + 'x', value)
+    except RuntimeError as error:
+        print(error, m.get_size())
+
+    print("\nincrement / setdefault / pop example 1")
+    print("--------------------------------------")
+    m = HashMap(11, hash_function_1)
+    for word in "the cat and the dog and the bird".split():
+        m.increment(word)
+    m.put('none', None)
+    print(m.get('the'), m.setdefault('cat', 10), m.setdefault('cow', 10), m.get_size())
+    print(m.contains_key('none'), m.get('none', 'default'), m.get('owl', 'default'))
+    print(m.pop('the'), m.pop('owl', 0), m.contains_key('the'), m.get_size())
+    try:
+        m.pop('owl')
+    except KeyError as error:
+        print('KeyError', error)
+
+    print("\nget_stats example 1")
+    print("-------------------")
+    for function in (hash_function_1, hash_function_2):
+        m = HashMap(11, function, stats=True)
+        for i in range(500):
+            m.put('key' + str(i), i)
+        for i in range(0, 1000, 2):
+            m.get('key' + str(i))
+        for i in range(0, 500, 5):
+            m.remove('key' + str(i))
+        stats = m.get_stats()
+        print(function.__name__, stats['size'], stats['capacity'], stats['resizes'],
+              stats['max_chain'], stats['chain_histogram'][:4], round(stats['hit_ratio'], 2))
+
+    print("\nSortedChain example 1")
+    print("---------------------")
+    # Every permutation of one string has the same hash_function_1 code
+    m = HashMap(11, hash_function_1)
+    keys = [''.join(letters) for letters in permutations('abcdefg')]
+    for key in keys:
+        m.put(key, len(key))
+    chains = [m._buckets[i] for i in range(m.get_capacity())]
+    print(m.get_size(), max(chain.length() for chain in chains),
+          sum(type(chain) is SortedChain for chain in chains), m.contains_key('gfedcba'))
+    for key in keys[:-3]:
+        m.remove(key)
+    print(m.get_size(), m.get_keys_and_values())
+
+    print("\nresize policy example 1")
+    print("-----------------------")
+    for options in ({}, {'load_factor': 0.75, 'growth_factor': 4, 'min_load_factor': 0.1},
+                    {'auto_tune': True}, {'auto_tune': True, 'memory_budget': 1500}):
+        m = HashMap(11, hash_function_2, **options)
+        capacities = []
+        for i in range(2000):
+            m.put('key' + str(i), i)
+        capacities.append(m.get_capacity())
+        for i in range(1990):
+            m.remove('key' + str(i))
+        capacities.append(m.get_capacity())
+        policy = m.get_resize_policy()
+        print(capacities, m.get_size(), m.get('key1995'), round(policy['load_factor'], 2),
+              policy['growth_factor'], policy['tune_rounds'])
+
+    print("\naput / resize_async example 1")
+    print("------------------------------")
+
+    async def fill(hash_map, start, stop):
+        for i in range(start, stop):
+            await hash_map.aput('key' + str(i), i)
+
+    async def resize_while_filling(hash_map):
+        # Two coroutines keep writing while the table grows in the background
+        await asyncio.gather(fill(hash_map, 0, 1000), fill(hash_map, 1000, 2000))
+        capacity = hash_map.get_capacity()
+        await asyncio.gather(hash_map.resize_async(4 * capacity), fill(hash_map, 2000, 2500))
+        return capacity
+
+    m = HashMap(11, hash_function_1)
+    capacity = asyncio.run(resize_while_filling(m))
+    print(m.get_size(), capacity, m.get_capacity(),
+          all(m.get('key' + str(i)) == i for i in range(2500)))
+
+    print("\nsave / load example 2")
+    print("---------------------")
+    m = HashMap(11, hash_function_1, load_factor=3.0, growth_factor=1.5, min_load_factor=0.5)
+    for i in range(69):
+        m.put('key' + str(i), i)
+    path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+    m.save(path)
+    restored = HashMap.load(path)
+    # The resize policy survives the round trip, so the next put does not grow the table
+    print(restored.get_resize_policy() == m.get_resize_policy(), restored.get_resize_policy())
+    restored.put('key69', 69)
+    print(restored.get_capacity() == m.get_capacity(), m.get_capacity(), restored.get('key69'))
+    os.remove(path)
+
+    print("\nsave / load example 3")
+    print("---------------------")
+    m = HashMap(101, hash_function_1, min_load_factor=0.25, auto_tune=True, memory_budget=5000)
+    for i in range(1000):
+        m.put('key' + str(i), i)
+    m.save(path)
+    restored = HashMap.load(path)
+    policy = restored.get_resize_policy()
+    print(policy['auto_tune'], restored._tuner.memory_budget, restored.get_capacity() == m.get_capacity())
+    # Emptied, the restored map shrinks no further than the original first capacity
+    for i in range(1000):
+        restored.remove('key' + str(i))
+    print(restored.get_size(), restored.get_capacity())
+    os.remove(path)
@@ -0,0 +1,565 @@
+# Description: Open Addressing hash table kept in shared memory, written by one
+# process and read by many. Keys are split by hash code across shards; each shard
+# is a multiprocessing.shared_memory segment with the slot and heap layout of
+# hash_map_mmap, probed with the same quadratic probing. A small control segment
+# holds a sequence counter and a generation per shard: readers retry a lookup that
+# overlapped a write (a seqlock), and a shard that has to grow is rebuilt into a
+# new segment whose generation readers then attach to, so every process maps
+# one copy of the table instead of holding its own.
+
+import os
+import pickle
+import secrets
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from hash_map_include import hash_function_name, resolve_hash_function
+from hash_map_mmap import (MAGIC, HEADER, SLOT, EMPTY, LIVE, TOMBSTONE, HASH_MASK,
+                           find_slot, _next_prime)
+
+CONTROL_MAGIC = b'HMSH\x00\x00\x00\x01'
+
+# magic, shard count, hash function name
+CONTROL = struct.Struct('<8sQ32s')
+
+# sequence, generation; one per shard after the control header
+# The sequence is odd while the writer changes the shard
+SHARD = struct.Struct('<QQ')
+
+# One field of SHARD
+COUNTER = struct.Struct('<Q')
+
+# Smallest heap of a new segment, in bytes
+_MIN_HEAP = 4096
+
+# Default of pop(), tells "no default given" apart from a default of None
+_MISSING = object()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Map an existing segment without making this process responsible for it.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+
+    # Older versions register every attach with the resource tracker; readers
+    # share the writer's tracker when started from it (fork or multiprocessing)
+    return shared_memory.SharedMemory(name)
+
+
+class _Segment:
+    """
+    One generation of a shard: its shared memory and table geometry. The counts
+    below the geometry are only kept up to date in the writer process.
+    """
+    __slots__ = ('memory', 'generation', 'capacity', 'heap_offset', 'heap_capacity',
+                 'heap_length', 'size', 'tombstones')
+
+    def __init__(self, memory: shared_memory.SharedMemory, generation: int) -> None:
+        self.memory = memory
+        self.generation = generation
+        magic, capacity, size, heap_offset, heap_length, _ = HEADER.unpack_from(memory.buf, 0)
+        if magic != MAGIC:
+            raise ValueError("not a shared hash table segment: " + memory.name)
+
+        self.capacity = capacity
+        self.heap_offset = heap_offset
+        self.heap_capacity = memory.size - heap_offset
+        self.heap_length = heap_length
+        self.size = size
+        self.tombstones = 0
+
+
+class HashMap:
+    def __init__(self, name: str = None, create: bool = False, shards: int = 1,
+                 capacity: int = 11, function=hash_function_1) -> None:
+        """
+        Attach to the shared table called name as a reader, or with create=True
+        make a new one split into shards segments of capacity slots each and
+        become its only writer. A created table without a name gets a random one.
+        """
+        self._creator = None
+        self._segments = []
+
+        if not create:
+            self._control = _attach(name)
+            magic, shards, function_name = CONTROL.unpack_from(self._control.buf, 0)
+            if magic != CONTROL_MAGIC:
+                self._control.close()
+                raise ValueError("not a shared hash table: " + name)
+
+            self._name = name
+            self._shards = shards
+            self._hash_function = resolve_hash_function(function_name.rstrip(b'\x00').decode('ascii'))
+            self._segments = [None] * shards
+            return
+
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+
+        self._name = name or 'hm_' + secrets.token_hex(6)
+        self._shards = shards
+        self._hash_function = function
+        self._function_name = hash_function_name(function).encode('ascii')
+
+        self._control = shared_memory.SharedMemory(self._name, create=True,
+                                                   size=CONTROL.size + shards * SHARD.size)
+        CONTROL.pack_into(self._control.buf, 0, CONTROL_MAGIC, shards, self._function_name)
+
+        capacity = _next_prime(max(capacity, 3))
+        for shard in range(shards):
+            self._segments.append(self._new_segment(shard, 0, capacity, _MIN_HEAP))
+            SHARD.pack_into(self._control.buf, self._shard_offset(shard), 0, 0)
+
+        # Only the creating process writes and removes the segments,
+        # forked children that inherit this object are readers
+        self._creator = os.getpid()
+
+    def __enter__(self) -> "HashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def name(self) -> str:
+        """
+        Name readers attach to
+        """
+        return self._name
+
+    def close(self) -> None:
+        """
+        Unmap the table; the writer also removes its segments.
+        """
+        writer = self._is_writer()
+
+        for segment in self._segments:
+            if segment is not None:
+                segment.memory.close()
+                if writer:
+                    segment.memory.unlink()
+        self._segments = [None] * self._shards
+
+        self._control.close()
+        if writer:
+            self._control.unlink()
+            self._creator = None
+
+    def get_size(self) -> int:
+        """
+        Return size of map, summed over the shards
+        """
+        return sum(self._read(shard, lambda segment: HEADER.unpack_from(segment.memory.buf, 0)[2])
+                   for shard in range(self._shards))
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, summed over the shards
+        """
+        return sum(self._read(shard, lambda segment: segment.capacity)
+                   for shard in range(self._shards))
+
+    def get_shard_count(self) -> int:
+        """
+        Return number of shards
+        """
+        return self._shards
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Using quadratic probing in the key's shard, store or update the value.
+        New bytes go to the unused end of the heap first, so readers only
+        retry for the short moment the slot and header are written.
+        """
+        self._check_writer()
+
+        hash_code = self._hash_function(key) & HASH_MASK
+        shard = hash_code % self._shards
+        key_bytes = key.encode('utf-8')
+        value_bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        segment = self._segments[shard]
+        index, free = self._probe(segment, hash_code, key_bytes)
+        needed = len(value_bytes) + (len(key_bytes) if index is None else 0)
+
+        # Checking room for one more slot and the new bytes
+        if ((index is None and 2 * (segment.size + segment.tombstones + 1) > segment.capacity)
+                or segment.heap_length + needed > segment.heap_capacity):
+            segment = self._rebuild(shard, needed)
+            index, free = self._probe(segment, hash_code, key_bytes)
+
+        buffer = segment.memory.buf
+        heap_end = segment.heap_offset + segment.heap_length
+
+        if index is None:
+            key_offset = segment.heap_length
+            buffer[heap_end:heap_end + len(key_bytes)] = key_bytes
+            heap_end += len(key_bytes)
+        else:
+            key_offset = SLOT.unpack_from(buffer, HEADER.size + index * SLOT.size)[3]
+        value_offset = heap_end - segment.heap_offset
+        buffer[heap_end:heap_end + len(value_bytes)] = value_bytes
+
+        if index is None:
+            index = free
+            if buffer[HEADER.size + index * SLOT.size] == TOMBSTONE:
+                segment.tombstones -= 1
+            segment.size += 1
+        segment.heap_length += needed
+
+        self._begin_write(shard)
+        SLOT.pack_into(buffer, HEADER.size + index * SLOT.size, LIVE, len(key_bytes), hash_code,
+                       key_offset, value_offset, len(value_bytes))
+        self._write_header(segment)
+        self._end_write(shard)
+
+    def put_many(self, items) -> None:
+        """
+        Insert or update every (key, value) pair of an iterable.
+        """
+        for key, value in items:
+            self.put(key, value)
+
+    def remove(self, key: str) -> None:
+        """
+        Leave a tombstone in the slot of key. If the key is not present, do nothing.
+        """
+        self._check_writer()
+
+        hash_code = self._hash_function(key) & HASH_MASK
+        shard = hash_code % self._shards
+        segment = self._segments[shard]
+
+        index, _ = self._probe(segment, hash_code, key.encode('utf-8'))
+        if index is None:
+            return
+
+        segment.size -= 1
+        segment.tombstones += 1
+
+        self._begin_write(shard)
+        segment.memory.buf[HEADER.size + index * SLOT.size] = TOMBSTONE
+        self._write_header(segment)
+        self._end_write(shard)
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        Presenting the value from provided key, or default if it is not present.
+        """
+        hash_code = self._hash_function(key) & HASH_MASK
+        key_bytes = key.encode('utf-8')
+
+        def read(segment: _Segment) -> object:
+            slot = find_slot(segment.memory.buf, segment.capacity, segment.heap_offset,
+                             hash_code, key_bytes)
+            if slot is None:
+                return None
+            value_start = segment.heap_offset + slot[4]
+            return bytes(segment.memory.buf[value_start:value_start + slot[5]])
+
+        # Unpickled only once the bytes are known to be consistent
+        value_bytes = self._read(hash_code % self._shards, read)
+        if value_bytes is None:
+            return default
+
+        return pickle.loads(value_bytes)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        True for key in the hash map, False if nothing.
+        """
+        hash_code = self._hash_function(key) & HASH_MASK
+        key_bytes = key.encode('utf-8')
+
+        return self._read(hash_code % self._shards, lambda segment: find_slot(
+            segment.memory.buf, segment.capacity, segment.heap_offset,
+            hash_code, key_bytes) is not None)
+
+    def pop(self, key: str, default: object = _MISSING) -> object:
+        """
+        Remove key and return its value. A missing key returns default,
+        or raises KeyError when no default is given.
+        """
+        self._check_writer()
+
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+
+        self.remove(key)
+        return value
+
+    def table_load(self) -> float:
+        """
+        Presenting the hash table load factor from calculating.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Presenting all key-value pairs as tuple in a dynamic array.
+        """
+        result = DynamicArray()
+        for item in self:
+            result.append((item.key, item.value))
+
+        return result
+
+    def __iter__(self):
+        """
+        Use only stored item for iterating, as HashEntry objects.
+        Each shard is copied out consistently, one shard at a time.
+        """
+        for shard in range(self._shards):
+            for key_bytes, value_bytes in self._read(shard, self._live_items):
+                yield HashEntry(key_bytes.decode('utf-8'), pickle.loads(value_bytes))
+
+    # ------------------------------------------------------------------ #
+
+    def _is_writer(self) -> bool:
+        """
+        Checking whether this process created the table.
+        """
+        return self._creator == os.getpid()
+
+    def _check_writer(self) -> None:
+        """
+        Raise unless this process is the writer.
+        """
+        if not self._is_writer():
+            raise PermissionError("only the process that created a shared table can change it")
+
+    def _shard_offset(self, shard: int) -> int:
+        """
+        Return the control segment offset of the sequence and generation of shard.
+        """
+        return CONTROL.size + shard * SHARD.size
+
+    def _segment_name(self, shard: int, generation: int) -> str:
+        """
+        Return the shared memory name of one generation of a shard.
+        """
+        return self._name + '_' + str(shard) + '_' + str(generation)
+
+    def _read(self, shard: int, read) -> object:
+        """
+        Run read(segment) on the current segment of shard until it runs
+        without a write in between, attaching to a new generation when needed.
+        """
+        offset = self._shard_offset(shard)
+        while True:
+            sequence, generation = SHARD.unpack_from(self._control.buf, offset)
+
+            # The writer is in the middle of a change
+            if sequence & 1:
+                time.sleep(0)
+                continue
+
+            segment = self._segments[shard]
+            if segment is None or segment.generation != generation:
+                try:
+                    segment = self._switch(shard, generation)
+                except FileNotFoundError:
+                    # Replaced again and removed before it could be attached
+                    continue
+
+            try:
+                result = read(segment)
+            except (IndexError, ValueError, struct.error):
+                # A torn read is retried, an error without a write in between is real
+                if SHARD.unpack_from(self._control.buf, offset)[0] == sequence:
+                    raise
+                continue
+
+            if SHARD.unpack_from(self._control.buf, offset)[0] == sequence:
+                return result
+
+    def _switch(self, shard: int, generation: int) -> _Segment:
+        """
+        Reader side: attach to a new generation of shard and drop the old one.
+        """
+        segment = _Segment(_attach(self._segment_name(shard, generation)), generation)
+
+        if self._segments[shard] is not None:
+            self._segments[shard].memory.close()
+        self._segments[shard] = segment
+
+        return segment
+
+    def _live_items(self, segment: _Segment) -> list:
+        """
+        Copy out the key and value bytes of every live slot of segment.
+        """
+        buffer = segment.memory.buf
+        items = []
+        for i in range(segment.capacity):
+            slot = SLOT.unpack_from(buffer, HEADER.size + i * SLOT.size)
+            if slot[0] == LIVE:
+                key_start = segment.heap_offset + slot[3]
+                value_start = segment.heap_offset + slot[4]
+                items.append((bytes(buffer[key_start:key_start + slot[1]]),
+                              bytes(buffer[value_start:value_start + slot[5]])))
+
+        return items
+
+    def _probe(self, segment: _Segment, hash_code: int, key_bytes: bytes) -> tuple:
+        """
+        Writer side: return (slot index of key or None,
+        first slot index a new key can take).
+        """
+        buffer = segment.memory.buf
+        index = hash_code % segment.capacity
+        step = 1
+        free = None
+
+        while True:
+            slot = SLOT.unpack_from(buffer, HEADER.size + index * SLOT.size)
+            if slot[0] == EMPTY:
+                return None, index if free is None else free
+
+            if slot[0] == TOMBSTONE:
+                if free is None:
+                    free = index
+            elif slot[2] == hash_code and slot[1] == len(key_bytes):
+                key_start = segment.heap_offset + slot[3]
+                if buffer[key_start:key_start + slot[1]] == key_bytes:
+                    return index, free
+
+            index = (index + step) % segment.capacity
+            step += 2
+
+    def _new_segment(self, shard: int, generation: int, capacity: int, heap_capacity: int) -> _Segment:
+        """
+        Writer side: create an empty segment for one generation of shard.
+        """
+        heap_offset = HEADER.size + capacity * SLOT.size
+        memory = shared_memory.SharedMemory(self._segment_name(shard, generation), create=True,
+                                            size=heap_offset + heap_capacity)
+        HEADER.pack_into(memory.buf, 0, MAGIC, capacity, 0, heap_offset, 0, self._function_name)
+
+        return _Segment(memory, generation)
+
+    def _rebuild(self, shard: int, needed: int) -> _Segment:
+        """
+        Writer side: copy the live slots of shard into a new generation with
+        room for one more slot and needed more heap bytes, then publish it.
+        The stored hash codes and bytes are copied, no key is rehashed or unpickled.
+        """
+        old = self._segments[shard]
+        items = self._live_items(old)
+        slots = (SLOT.unpack_from(old.memory.buf, HEADER.size + i * SLOT.size)
+                 for i in range(old.capacity))
+        hash_codes = [slot[2] for slot in slots if slot[0] == LIVE]
+
+        # Grow once the live keys alone pass a quarter of the slots
+        capacity = old.capacity
+        if 4 * (old.size + 1) > capacity:
+            capacity = _next_prime(4 * (old.size + 1) + 1)
+
+        live_bytes = sum(len(key) + len(value) for key, value in items)
+        segment = self._new_segment(shard, old.generation + 1, capacity,
+                                    max(2 * (live_bytes + needed), _MIN_HEAP))
+
+        buffer = segment.memory.buf
+        heap_end = segment.heap_offset
+        for hash_code, (key_bytes, value_bytes) in zip(hash_codes, items):
+            key_offset = heap_end - segment.heap_offset
+            buffer[heap_end:heap_end + len(key_bytes)] = key_bytes
+            heap_end += len(key_bytes)
+            buffer[heap_end:heap_end + len(value_bytes)] = value_bytes
+            heap_end += len(value_bytes)
+
+            _, index = self._probe(segment, hash_code, b'')
+            SLOT.pack_into(buffer, HEADER.size + index * SLOT.size, LIVE, len(key_bytes), hash_code,
+                           key_offset, key_offset + len(key_bytes), len(value_bytes))
+
+        segment.size = len(items)
+        segment.heap_length = heap_end - segment.heap_offset
+        self._write_header(segment)
+
+        # Readers move over at their next lookup; the old segment stays mapped
+        # in processes still using it until they attach to the new one
+        self._begin_write(shard)
+        self._segments[shard] = segment
+        COUNTER.pack_into(self._control.buf, self._shard_offset(shard) + COUNTER.size,
+                          segment.generation)
+        self._end_write(shard)
+
+        old.memory.close()
+        old.memory.unlink()
+        return segment
+
+    def _write_header(self, segment: _Segment) -> None:
+        """
+        Writer side: store the size and heap length of segment in its header.
+        """
+        HEADER.pack_into(segment.memory.buf, 0, MAGIC, segment.capacity, segment.size,
+                         segment.heap_offset, segment.heap_length, self._function_name)
+
+    def _begin_write(self, shard: int) -> None:
+        """
+        Writer side: make the sequence of shard odd, readers retry until it is even.
+        """
+        offset = self._shard_offset(shard)
+        sequence = COUNTER.unpack_from(self._control.buf, offset)[0]
+        COUNTER.pack_into(self._control.buf, offset, sequence + 1)
+
+    def _end_write(self, shard: int) -> None:
+        """
+        Writer side: make the sequence of shard even again.
+        """
+        self._begin_write(shard)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+def _reader(name: str, keys: list, results) -> None:
+    """
+    Example reader process: attach by name and look up keys.
+    """
+    with HashMap(name) as m:
+        results.put((m.get_size(), [m.get(key) for key in keys]))
+
+
+if __name__ == "__main__":
+    import multiprocessing
+
+    print("\nput / get example 1")
+    print("-------------------")
+    with HashMap(create=True, shards=4) as m:
+        for i in range(1, 1000, 20):
+            m.put(str(i), i * 42)
+        m.put('1', 'updated')
+        m.remove('21')
+        print(m.get_size(), m.get('1'), m.get('21'), m.get('41'), m.contains_key('61'))
+        print(m.get_shard_count(), m.table_load() <= 0.5)
+
+    print("\nreader processes example 1")
+    print("--------------------------")
+    with HashMap(create=True, shards=2, function=hash_function_2) as m:
+        m.put_many(('key' + str(i), i) for i in range(5000))
+        results = multiprocessing.Queue()
+        readers = [multiprocessing.Process(target=_reader,
+                                           args=(m.name, ['key0', 'key4999', 'missing'], results))
+                   for _ in range(3)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            print(results.get())
+            reader.join()
+        with HashMap(m.name) as reader:
+            try:
+                reader.put('key0', 1)
+            except PermissionError as error:
+                print(error)
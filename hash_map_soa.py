@@ -0,0 +1,462 @@
+# Description: The hash table uses Open Addressing with Quadratic Probing like
+# hash_map_oa, but stores its slots as parallel flat columns (hash codes, keys,
+# values and slot states) instead of one HashEntry object per slot.
+# Probes only read the compact hash and state columns until a hash code matches.
+# It must be run in average O(1) runtime complexity.
+
+from array import array
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+
+# Slot states kept in the state column
+_EMPTY = 0
+_LIVE = 1
+_TOMBSTONE = 2
+
+# Hash codes are stored as unsigned 64-bit values
+_HASH_MASK = (1 << 64) - 1
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses
+        quadratic probing over flat column storage
+        """
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+
+        # Bumped by every change of the set of keys, checked by live iterators
+        self._version = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide the same output as hash_map_oa
+        """
+        out = ''
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._entry_at(i)) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_tombstone_count(self) -> int:
+        """
+        Return number of tombstones currently left in the table
+        """
+        return self._tombstones
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Using hash map quadratic probing, refresh the state of key-value pair.
+        If live entries plus tombstones reach half of the table, the table is rebuilt
+        """
+        # Rebuild is needed or not, tombstones still occupy the probe sequences
+        if (self._size + self._tombstones) / self._capacity >= 0.5:
+            self._rebuild()
+
+        self._insert(key, value, self._hash_function(key) & _HASH_MASK)
+
+    def put_many(self, items) -> None:
+        """
+        Insert or update every (key, value) pair of an iterable.
+        The table is sized once up front, so no load check or resize happens per pair.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        # Worst case every pair is a new key
+        self.reserve(self._size + len(pairs))
+
+        hash_function = self._hash_function
+        for key, value in pairs:
+            self._insert(key, value, hash_function(key) & _HASH_MASK)
+
+    @classmethod
+    def from_items(cls, items, function) -> "HashMap":
+        """
+        Build a new hash map from an iterable of (key, value) pairs,
+        allocating the final capacity directly.
+        """
+        pairs = items if isinstance(items, (list, tuple)) else list(items)
+
+        hash_map = cls(2 * len(pairs), function)
+        hash_map.put_many(pairs)
+        return hash_map
+
+    def reserve(self, count: int) -> None:
+        """
+        Resize the table once so that count entries fit under the 0.5 load factor.
+        Leftover tombstones are dropped by the same rebuild. The table never shrinks here.
+        """
+        if count > 0 and (count + self._tombstones - 1) / self._capacity >= 0.5:
+            self.resize_table(max(2 * count, self._capacity))
+
+    def _insert(self, key: str, value: object, hash_code: int) -> None:
+        """
+        Insert or update a key-value pair without checking the load factor.
+        """
+        capacity = self._capacity
+        states = self._states
+        hashes = self._hashes
+        keys = self._keys
+
+        # Check the index location at first
+        start_index = hash_code % capacity
+        first_tomb = None
+
+        # Search the slots by using quadratic probing
+        for j in range(capacity):
+            index = (start_index + j * j) % capacity
+            state = states[index]
+
+            # Check empty or tombstone for insertion
+            if state == _EMPTY:
+                if first_tomb is not None:
+                    index = first_tomb
+                    self._tombstones -= 1
+                self._store(index, key, value, hash_code)
+                self._size += 1
+                self._version += 1
+                return
+
+            # Check and save the tombstone
+            elif state == _TOMBSTONE:
+                if first_tomb is None:
+                    first_tomb = index
+
+            # Refresh
+            elif hashes[index] == hash_code and keys[index] == key:
+                self._values[index] = value
+                return
+
+        # Adding item into first tombstone after retrieve
+        if first_tomb is not None:
+            self._store(first_tomb, key, value, hash_code)
+            self._size += 1
+            self._tombstones -= 1
+            self._version += 1
+            return
+
+        # Just in case, what error comes from
+        raise Exception("Hash table is full")
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Modify the hash table capacity without tombstones
+        """
+        # Check for using the new capacity correctly
+        if new_capacity < self._size:
+            return
+
+        # new_capacity is prime or not
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        # Keep growing while the entries would not fit under the load factor
+        while self._size > 0 and (self._size - 1) / new_capacity >= 0.5:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        # Make new columns and save previous ones
+        prev_states = self._states
+        prev_hashes = self._hashes
+        prev_keys = self._keys
+        prev_values = self._values
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._version += 1
+        self._allocate(new_capacity)
+
+        # Refresh all from the cached hash codes, the new table has no
+        # tombstones or duplicates so the first empty slot is the target
+        states = self._states
+        for i in range(len(prev_states)):
+            if prev_states[i] != _LIVE:
+                continue
+
+            hash_code = prev_hashes[i]
+            start_index = hash_code % new_capacity
+            for j in range(new_capacity):
+                index = (start_index + j * j) % new_capacity
+                if states[index] == _EMPTY:
+                    self._store(index, prev_keys[i], prev_values[i], hash_code)
+                    break
+
+    def table_load(self) -> float:
+        """
+        Presenting the hash table load factor from calculating.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        The result is how many empty buckets in hash table.
+        """
+        return self._states.count(_EMPTY)
+
+    def get(self, key: str) -> object:
+        """
+        Using quadratic probing, presenting the value from provided key.
+        """
+        index = self._find_index(key, self._hash_function(key) & _HASH_MASK)
+        if index is None:
+            return None
+
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        True for key in the hash map, False if nothing.
+        A key stored with the value None is still present.
+        """
+        if self._size == 0:
+            return False
+
+        return self._find_index(key, self._hash_function(key) & _HASH_MASK) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Target key removed, and then mark its slot as a tombstone.
+        """
+        index = self._find_index(key, self._hash_function(key) & _HASH_MASK)
+        if index is None:
+            return
+
+        self._states[index] = _TOMBSTONE
+        self._size -= 1
+        self._tombstones += 1
+        self._version += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Presenting all active key-value pairs as tuple in a dynamic array.
+        """
+        result = DynamicArray()
+
+        # Retrieve all
+        states = self._states
+        for i in range(self._capacity):
+            if states[i] == _LIVE:
+                result.append((self._keys[i], self._values[i]))
+
+        return result
+
+    def clear(self) -> None:
+        """
+        Empty hash map without any changes.
+        """
+        self._size = 0
+        self._tombstones = 0
+        self._version += 1
+        self._allocate(self._capacity)
+
+    def _rebuild(self) -> None:
+        """
+        Rebuild the table once live entries plus tombstones fill half of it.
+        Mostly live entries double the capacity, mostly tombstones are compacted
+        at the same capacity, either way the table is left at most a quarter full.
+        """
+        if self._size >= self._tombstones:
+            self.resize_table(self._capacity * 2)
+        else:
+            self.resize_table(self._capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Create empty columns for the given number of slots.
+        """
+        self._states = bytearray(capacity)
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def _store(self, index: int, key: str, value: object, hash_code: int) -> None:
+        """
+        Write one live entry into every column at index.
+        """
+        self._states[index] = _LIVE
+        self._hashes[index] = hash_code
+        self._keys[index] = key
+        self._values[index] = value
+
+    def _find_index(self, key: str, hash_code: int) -> object:
+        """
+        Return the slot index of a live key, or None.
+        """
+        capacity = self._capacity
+        states = self._states
+        hashes = self._hashes
+        keys = self._keys
+
+        # Using quadratic probing to find
+        start_index = hash_code % capacity
+        for j in range(capacity):
+            index = (start_index + j * j) % capacity
+            state = states[index]
+
+            # Empty if key does not exist
+            if state == _EMPTY:
+                return None
+
+            # Matching key-value pair
+            if state == _LIVE and hashes[index] == hash_code and keys[index] == key:
+                return index
+
+        # Nothing to match
+        return None
+
+    def _entry_at(self, index: int) -> object:
+        """
+        Build a HashEntry view of one slot, or None for an empty slot.
+        """
+        state = self._states[index]
+        if state == _EMPTY:
+            return None
+
+        entry = HashEntry(self._keys[index], self._values[index])
+        entry.is_tombstone = state == _TOMBSTONE
+        return entry
+
+    def keys(self):
+        """
+        Lazily yield every stored key straight from the key column.
+        """
+        for index in self._live_indices():
+            yield self._keys[index]
+
+    def values(self):
+        """
+        Lazily yield every stored value straight from the value column.
+        """
+        for index in self._live_indices():
+            yield self._values[index]
+
+    def items(self):
+        """
+        Lazily yield every stored (key, value) pair.
+        """
+        for index in self._live_indices():
+            yield self._keys[index], self._values[index]
+
+    def __iter__(self):
+        """
+        Use only stored item for iterating, as HashEntry objects.
+        Every call returns its own iterator.
+        """
+        for index in self._live_indices():
+            yield self._entry_at(index)
+
+    def _live_indices(self):
+        """
+        Yield the index of every live slot.
+        Raises RuntimeError if a key is added or removed while iterating.
+        """
+        version = self._version
+
+        for index in range(self._capacity):
+            if self._states[index] == _LIVE:
+                yield index
+
+                if self._version != version:
+                    raise RuntimeError("HashMap changed size during iteration")
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\ncontains_key / remove example 1")
+    print("-------------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    for key in keys[::2]:
+        m.remove(str(key))
+    print(result, m.get_size(), m.get_tombstone_count(), m.get_capacity())
+
+    print("\nget_keys_and_values example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\n__iter__(), __next__() example 1")
+    print("--------------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
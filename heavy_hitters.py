@@ -0,0 +1,194 @@
+# Description: Streaming approximate mode and top-k (heavy hitters) using the
+# Space-Saving algorithm. Only a fixed number of counters is kept, stored in a
+# Separate Chaining HashMap, so an unbounded stream is read once in fixed memory.
+# Every reported count overestimates the true frequency by at most its error,
+# and any key that is not reported occurred at most error_bound() times.
+
+from heapq import heapify, heappop, heappush
+from itertools import count as sequence
+
+from a6_include import DynamicArray
+from hash_map_sc import HashMap
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int = 1000) -> None:
+        """
+        Initialize a summary that tracks at most capacity keys
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self._capacity = capacity
+        self._total = 0
+
+        # key -> [count, error], updated in place so a hit costs a single lookup
+        self._counters = HashMap(capacity)
+
+        # Min-heap of (count, order, key); entries are refreshed lazily and
+        # the stale ones are skipped when the minimum is needed
+        self._heap = []
+        self._order = sequence()
+
+    def get_capacity(self) -> int:
+        """
+        Return maximum number of tracked keys
+        """
+        return self._capacity
+
+    def get_size(self) -> int:
+        """
+        Return number of tracked keys
+        """
+        return self._counters.get_size()
+
+    def get_total(self) -> int:
+        """
+        Return total weight of the stream seen so far
+        """
+        return self._total
+
+    # ------------------------------------------------------------------ #
+
+    def update(self, key: str, weight: int = 1) -> None:
+        """
+        Count one occurrence (or weight occurrences) of key.
+        An untracked key replaces the key with the smallest count and inherits
+        that count as its error.
+        """
+        self._total += weight
+        counter = self._counters.get(key)
+
+        if counter is not None:
+            counter[0] += weight
+        elif self._counters.get_size() < self._capacity:
+            counter = [weight, 0]
+            self._counters.put(key, counter)
+        else:
+            min_count, min_key = self._pop_min()
+            self._counters.remove(min_key)
+            counter = [min_count + weight, min_count]
+            self._counters.put(key, counter)
+
+        heappush(self._heap, (counter[0], next(self._order), key))
+
+        # Drop stale heap entries once they outnumber the live ones
+        if len(self._heap) > 4 * self._capacity:
+            self._rebuild_heap()
+
+    def consume(self, stream) -> None:
+        """
+        Count every key of an iterable or generator in one pass.
+        """
+        for key in stream:
+            self.update(key)
+
+    def top(self, n: int = None) -> DynamicArray:
+        """
+        Presenting up to n tracked keys as (key, count, error) tuples,
+        highest count first. The true frequency lies in [count - error, count].
+        """
+        tuples = self._counters.get_keys_and_values()
+        entries = []
+        for i in range(tuples.length()):
+            key, counter = tuples[i]
+            entries.append((key, counter[0], counter[1]))
+
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        if n is not None:
+            entries = entries[:n]
+
+        return DynamicArray(entries)
+
+    def mode(self) -> tuple[DynamicArray, int]:
+        """
+        Presenting the keys with the highest estimated count and that count,
+        in the same shape as hash_map_sc.find_mode.
+        """
+        result = DynamicArray()
+        max_frequency = 0
+
+        tuples = self._counters.get_keys_and_values()
+        for i in range(tuples.length()):
+            key, counter = tuples[i]
+            if counter[0] > max_frequency:
+                max_frequency = counter[0]
+
+        for i in range(tuples.length()):
+            key, counter = tuples[i]
+            if counter[0] == max_frequency:
+                result.append(key)
+
+        return result, max_frequency
+
+    def error_bound(self) -> float:
+        """
+        Return the most any single count can overestimate, total / capacity.
+        This is also the most often an untracked key can have occurred.
+        """
+        return self._total / self._capacity
+
+    def _pop_min(self) -> tuple[int, str]:
+        """
+        Remove and return the (count, key) of the tracked key with the smallest count.
+        """
+        while True:
+            count, _, key = heappop(self._heap)
+            counter = self._counters.get(key)
+
+            # Skip entries left behind by later increments or evictions
+            if counter is not None and counter[0] == count:
+                return count, key
+
+    def _rebuild_heap(self) -> None:
+        """
+        Rebuild the heap from the live counters only.
+        """
+        self._heap = []
+        tuples = self._counters.get_keys_and_values()
+        for i in range(tuples.length()):
+            key, counter = tuples[i]
+            self._heap.append((counter[0], next(self._order), key))
+        heapify(self._heap)
+
+
+def find_mode_stream(stream, capacity: int = 1000) -> tuple[DynamicArray, int]:
+    """
+    Presenting an approximate mode of an iterable or generator and its estimated
+    frequency in one pass with at most capacity counters.
+    Exact whenever the stream has no more than capacity distinct keys.
+    """
+    summary = SpaceSaving(capacity)
+    summary.consume(stream)
+    return summary.mode()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nfind_mode_stream example 1")
+    print("--------------------------")
+    words = ["apple", "apple", "grape", "melon", "peach"]
+    mode, frequency = find_mode_stream(iter(words))
+    print(f"Input: {words}\nMode : {mode}, Frequency: {frequency}")
+
+    print("\nSpaceSaving example 1")
+    print("---------------------")
+
+    def events(n):
+        # A few hot keys inside a long tail of rare ones
+        for i in range(n):
+            if i % 3 == 0:
+                yield 'hot' + str(i % 4)
+            else:
+                yield 'cold' + str(i)
+
+    summary = SpaceSaving(50)
+    summary.consume(events(30000))
+    print(summary.get_total(), summary.get_size(), round(summary.error_bound(), 2))
+    top = summary.top(4)
+    for i in range(top.length()):
+        key, count, error = top[i]
+        print(key, count, error, count - error)